@@ -0,0 +1,108 @@
+"""End-to-end load harness against local stand-ins for Readwise, OpenAI and the GitHub gist API.
+
+Usage:
+    python benchmarks/load_harness.py --docs 2000 --page-size 100 --latency-ms 20 --rate-429 0.05
+    python benchmarks/load_harness.py --docs 500 -- --dry-run --stream
+Arguments after `--` are passed on to src/main.py.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, "..", "src")
+
+from stand_in_servers import StandInConfig, start_server  # noqa: E402
+from synthetic_feed import generate_documents, generate_filters  # noqa: E402
+
+
+def _create_config(args: argparse.Namespace) -> StandInConfig:
+    return StandInConfig(
+        latency=args.latency_ms / 1000,
+        page_size=args.page_size,
+        rate_429=args.rate_429,
+        failure_rate=args.failure_rate,
+        retry_after=args.retry_after,
+        documents=generate_documents(args.docs, args.seed, args.duplicate_rate),
+        filters=json.dumps(generate_filters(args.filter_size, args.seed)),
+        rng=random.Random(args.seed),
+        lock=threading.Lock(),
+        calls={},
+    )
+
+
+def _configure_environment(base_url: str, args: argparse.Namespace) -> None:
+    """Points the cleaner at the stand-ins before any of its modules are imported."""
+    os.environ.update(
+        {
+            "READWISE_API_TOKEN": "harness-token",
+            "READWISE_BASE_URL": f"{base_url}/api/v3",
+            "READWISE_REQUESTS_PER_MINUTE": str(args.requests_per_minute),
+            "GIST_ID": "harness",
+            "GIST_API_URL": f"{base_url}/gists",
+            "OPENAI_API_TOKEN": "harness-key",
+            "OPENAI_BASE_URL": f"{base_url}/v1",
+            "STATE_DIR": args.state_dir or tempfile.mkdtemp(prefix="rss-cleaner-harness-"),
+        }
+    )
+
+
+def _report(config: StandInConfig, wall: float) -> None:
+    calls = dict(sorted(config.calls.items()))
+    bytes_sent = calls.pop("bytes_sent", 0)
+    actions = calls.get("delete", 0) + calls.get("update", 0)
+    print("\n--- Load Harness Report ---")
+    print(f"Wall time:        {wall:.2f} s")
+    print(f"Documents/s:      {len(config.documents) / wall:.1f}")
+    print(f"Action calls/s:   {actions / wall:.1f}")
+    print(f"Bytes served:     {bytes_sent}")
+    print(f"API calls:        {json.dumps(calls)}")
+
+
+def _parse_arguments() -> Tuple[argparse.Namespace, List[str]]:
+    argv = sys.argv[1:]
+    main_args = argv[argv.index("--") + 1 :] if "--" in argv else []
+    harness_args = argv[: argv.index("--")] if "--" in argv else argv
+    parser = argparse.ArgumentParser(description="Run main.main against local API stand-ins.")
+    parser.add_argument("--docs", type=int, default=1_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--filter-size", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability of a 429 on action/AI calls.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability of a 500 on action/AI calls.")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--requests-per-minute", type=float, default=6_000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Share of syndicated near-duplicates.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--state-dir", default=None, help="Reuse a state directory, e.g. to test resuming a killed run."
+    )
+    return parser.parse_args(harness_args), main_args
+
+
+def main() -> None:
+    args, main_args = _parse_arguments()
+    config = _create_config(args)
+    server, base_url = start_server(config)
+    _configure_environment(base_url, args)
+
+    sys.path.insert(0, SRC_DIR)
+    import main as cleaner_main
+
+    sys.argv = ["main.py", "--updated-after", "2000-01-01T00:00:00", *main_args]
+    start = time.perf_counter()
+    cleaner_main.main()
+    wall = time.perf_counter() - start
+    server.shutdown()
+    _report(config, wall)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Micro-benchmarks for the local hot paths.
+
+Usage:
+    python benchmarks/run_benchmarks.py --docs 1000 10000 --filter-sizes 10 500
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --compare
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+os.environ.setdefault("STATE_DIR", tempfile.mkdtemp(prefix="rss-cleaner-bench-"))
+
+from rich.console import Console  # noqa: E402
+
+import print_helpers  # noqa: E402
+from data_types import Document  # noqa: E402
+from dedupe import create_index, find_duplicates  # noqa: E402
+from decision_engine import plan_actions  # noqa: E402
+from filtering import compile_filters, determine_save_location  # noqa: E402
+from openai_client import _build_prompt, _filter_docs_for_prompt  # noqa: E402
+from readwise_client import to_document  # noqa: E402
+from synthetic_feed import generate_documents, generate_filters  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+REGRESSION_TOLERANCE = 0.20
+
+
+def _stages(documents: List[Document], filters: Dict[str, List[str]]) -> Dict[str, Callable[[], Any]]:
+    """Returns the stages to benchmark, each as a zero-argument callable."""
+    matchers = compile_filters(filters)
+    # The local rules only; the AI stage would call OpenAI
+    local_filters = {**filters, "ai_topic_exclude": []}
+    plan = plan_actions(documents, local_filters)
+    docs_for_prompt = _filter_docs_for_prompt(documents)
+    return {
+        "plan_actions": lambda: plan_actions(documents, local_filters),
+        "determine_save_location": lambda: [determine_save_location(doc, matchers) for doc in documents],
+        "filter_docs_for_prompt": lambda: _filter_docs_for_prompt(documents),
+        "build_prompt": lambda: _build_prompt(docs_for_prompt, filters["ai_topic_exclude"]),
+        "find_duplicates": lambda: find_duplicates(create_index(), documents),
+        "print_dry_run": lambda: print_helpers.print_dry_run(documents, plan.delete_ids),
+        "print_dry_run_save": lambda: print_helpers.print_dry_run_save(documents, plan.save_actions),
+    }
+
+
+def _measure(stage: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Times the best of several runs, then measures peak memory in a separate traced run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(timings), "peak_kib": peak / 1024}
+
+
+def run(doc_counts: List[int], filter_sizes: List[int], repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    # Keep dry-run printers from flooding the terminal while still rendering
+    print_helpers.CONSOLE = Console(file=io.StringIO(), width=120)
+    results = {}
+    for doc_count in doc_counts:
+        documents = [to_document(raw) for raw in generate_documents(doc_count, seed)]
+        for filter_size in filter_sizes:
+            filters = generate_filters(filter_size, seed)
+            for name, stage in _stages(documents, filters).items():
+                key = f"{name}[docs={doc_count},filters={filter_size}]"
+                results[key] = _measure(stage, repeat)
+                print(f"{key:<60} {results[key]['seconds'] * 1000:>10.2f} ms {results[key]['peak_kib']:>12.1f} KiB")
+                print_helpers.CONSOLE.file = io.StringIO()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline_path: str) -> bool:
+    """Prints stages slower than the baseline beyond the tolerance and returns whether all passed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    passed = True
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result["seconds"] / max(baseline[key]["seconds"], 1e-9)
+        if ratio > 1 + REGRESSION_TOLERANCE:
+            passed = False
+            print(f"REGRESSION {key}: {ratio:.2f}x baseline")
+    return passed
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark filtering, save routing and prompt building.")
+    parser.add_argument("--docs", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--filter-sizes", type=int, nargs="+", default=[10, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Fail if a stage regressed against the baseline.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_arguments()
+    results = run(args.docs, args.filter_sizes, args.repeat, args.seed)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare and not compare(results, args.baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Local stand-ins for the Readwise, OpenAI chat completions and GitHub gist APIs used by load_harness.py."""
+
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+GIST_ETAG = '"harness-filters"'
+AI_MATCH_WORD = "football"
+
+
+class StandInConfig(NamedTuple):
+    """Knobs and counters shared by all stand-in request handlers."""
+
+    latency: float
+    page_size: int
+    rate_429: float
+    failure_rate: float
+    retry_after: float
+    documents: List[Dict[str, Any]]
+    filters: str
+    rng: random.Random
+    lock: threading.Lock
+    calls: Dict[str, int]
+
+
+def _count(config: StandInConfig, name: str, amount: int = 1) -> None:
+    with config.lock:
+        config.calls[name] = config.calls.get(name, 0) + amount
+
+
+def _roll(config: StandInConfig, probability: float) -> bool:
+    with config.lock:
+        return config.rng.random() < probability
+
+
+def _make_handler(config: StandInConfig) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+        def _reply(self, status: int, body: Optional[Any] = None, headers: Optional[Dict[str, str]] = None) -> None:
+            payload = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            for key, value in {"Content-Type": "application/json", **(headers or {})}.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            _count(config, "bytes_sent", len(payload))
+
+        def _read_body(self) -> Dict[str, Any]:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _injected_error(self, name: str) -> bool:
+            """Simulates rate limiting and server failures on write and AI endpoints."""
+            if _roll(config, config.rate_429):
+                _count(config, f"{name}_429")
+                self._reply(429, {"detail": "throttled"}, {"Retry-After": str(config.retry_after)})
+                return True
+            if _roll(config, config.failure_rate):
+                _count(config, f"{name}_500")
+                self._reply(500, {"detail": "boom"})
+                return True
+            return False
+
+        def do_GET(self) -> None:
+            time.sleep(config.latency)
+            url = urllib.parse.urlparse(self.path)
+            if url.path.startswith("/gists/"):
+                _count(config, "gist")
+                if self.headers.get("If-None-Match") == GIST_ETAG:
+                    return self._reply(304)
+                return self._reply(200, {"files": {"filters.json": {"content": config.filters}}}, {"ETag": GIST_ETAG})
+            _count(config, "list")
+            offset = int(urllib.parse.parse_qs(url.query).get("pageCursor", ["0"])[0])
+            end = offset + config.page_size
+            next_cursor = str(end) if end < len(config.documents) else None
+            self._reply(200, {"results": config.documents[offset:end], "nextPageCursor": next_cursor})
+
+        def do_DELETE(self) -> None:
+            time.sleep(config.latency)
+            _count(config, "delete")
+            if not self._injected_error("delete"):
+                self._reply(204)
+
+        def do_PATCH(self) -> None:
+            time.sleep(config.latency)
+            _count(config, "update")
+            body = self._read_body()
+            if not self._injected_error("update"):
+                self._reply(200, {"location": body.get("location")})
+
+        def do_POST(self) -> None:
+            time.sleep(config.latency)
+            _count(config, "openai")
+            body = self._read_body()
+            if self._injected_error("openai"):
+                return
+            self._reply(200, _chat_completion(body))
+
+    return Handler
+
+
+def _chat_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Answers like the chat completions API, flagging documents whose summary mentions the match word."""
+    user_message = body["messages"][-1]["content"]
+    match = re.search(r"Documents: (\[.*\])", user_message)
+    documents = json.loads(match.group(1)) if match else []
+    matching = [doc["i"] for doc in documents if AI_MATCH_WORD in doc["s"].lower()]
+    return {
+        "id": "chatcmpl-harness",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "harness"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps({"matching_ids": matching})},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(user_message) // 4,
+            "completion_tokens": 5 + len(matching),
+            "total_tokens": len(user_message) // 4 + 5 + len(matching),
+        },
+    }
+
+
+def start_server(config: StandInConfig) -> Tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(config))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
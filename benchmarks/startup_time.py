@@ -0,0 +1,75 @@
+"""Startup-time check: imports src/main.py in fresh interpreters and enforces a time budget.
+
+Usage:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --budget-ms 300 --runs 5 --top 15
+Exits with status 1 if the import exceeds the budget or loads a dependency that should be lazy.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.normpath(os.path.join(BENCH_DIR, "..", "src"))
+
+# Only needed on the code paths that use them, never just to start up
+LAZY_MODULES = ["openai", "numpy", "rich", "dateutil", "tzlocal", "dotenv"]
+IMPORT_SCRIPT = (
+    f"import json, sys; sys.path.insert(0, {SRC_DIR!r}); import main; print(json.dumps(sorted(sys.modules)))"
+)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def _import_once() -> Tuple[float, List[str], Dict[str, int]]:
+    """Imports main in a fresh interpreter; returns wall seconds, loaded modules and top-level cumulative µs."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if (match := IMPORTTIME_LINE.match(line)) and len(match.group(3)) <= 3:
+            cumulative[match.group(4)] = int(match.group(2))
+    return wall, json.loads(result.stdout), cumulative
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check how long importing src/main.py takes.")
+    parser.add_argument("--budget-ms", type=float, default=400, help="Fail if the fastest run is slower.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to list.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_arguments()
+    runs = [_import_once() for _ in range(args.runs)]
+    wall, modules, cumulative = min(runs, key=lambda run: run[0])
+
+    print(f"Fastest of {args.runs} cold starts: {wall * 1000:.1f} ms (budget {args.budget_ms:g} ms)")
+    print("Slowest top-level imports:")
+    for name, micros in sorted(cumulative.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {name:<30} {micros / 1000:>8.1f} ms")
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"FAIL: loaded at startup but should be lazy: {', '.join(eager)}")
+    if wall * 1000 > args.budget_ms:
+        print("FAIL: startup exceeds the budget")
+    if eager or wall * 1000 > args.budget_ms:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import random
+import string
+from typing import Any, Dict, List
+
+WORDS = [
+    "market", "election", "football", "recipe", "climate", "startup", "theater", "python",
+    "nintendo", "review", "policy", "science", "music", "travel", "health", "finance",
+]
+DOMAINS = ["example.com", "news.example.org", "blog.sample.net", "daily.test.io", "feed.demo.se"]
+
+
+def _word(rng: random.Random) -> str:
+    return rng.choice(WORDS) if rng.random() < 0.7 else "".join(rng.choices(string.ascii_lowercase, k=7))
+
+
+def _rare_word(rng: random.Random) -> str:
+    """Mostly random tokens so generated filters only match a realistic share of the feed."""
+    return rng.choice(WORDS) if rng.random() < 0.02 else "".join(rng.choices(string.ascii_lowercase, k=6))
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(_word(rng) for _ in range(words)).capitalize()
+
+
+def _syndicate(documents: List[Dict[str, Any]], rate: float, rng: random.Random) -> None:
+    """Turns a share of documents into lightly edited copies of earlier ones from other sources."""
+    for i in range(1, len(documents)):
+        if rng.random() < rate:
+            original = documents[rng.randrange(i)]
+            documents[i].update(
+                title=original["title"],
+                summary=f"{original['summary']} {_word(rng)}",
+                source_url=f"https://{rng.choice(DOMAINS)}/syndicated/{i}?utm_source=feed",
+            )
+
+
+def generate_documents(count: int, seed: int = 42, duplicate_rate: float = 0.0) -> List[Dict[str, Any]]:
+    """Generates a reproducible feed that looks like Readwise list results."""
+    rng = random.Random(seed)
+    authors = [f"{_word(rng).title()} {_word(rng).title()}" for _ in range(max(10, count // 50))]
+    documents = [
+        {
+            "id": f"doc{i:07d}",
+            "title": _sentence(rng, rng.randint(4, 12)),
+            "source_url": f"https://{rng.choice(DOMAINS)}/{_word(rng)}/{i}",
+            "author": rng.choice(authors),
+            "summary": _sentence(rng, rng.randint(20, 60)),
+            "updated_at": f"2024-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+        }
+        for i in range(count)
+    ]
+    _syndicate(documents, duplicate_rate, random.Random(seed + 2))
+    return documents
+
+
+def generate_filters(size: int, seed: int = 42) -> Dict[str, List[str]]:
+    """Generates filter lists with the given number of entries per list."""
+    rng = random.Random(seed + 1)
+    return {
+        "title_exclude": [_rare_word(rng) for _ in range(size)],
+        "url_exclude": [f"{_rare_word(rng)}{i}.com" for i in range(size)],
+        "author_exclude": [_rare_word(rng).title() for _ in range(size)],
+        "ai_topic_exclude": ["articles about football", "artiklar om teater"],
+        "author_save_inbox": [_word(rng).title() for _ in range(max(1, size // 10))],
+        "author_save_later": [_word(rng).title() for _ in range(max(1, size // 10))],
+        "domain_exclude": [f"{_rare_word(rng)}{i}.org" for i in range(size)],
+    }
@@ -0,0 +1,88 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import CURRENT_ACCOUNT, load_account_concurrency
+from data_types import Account, AccountResult
+from metrics import scoped_counters
+from print_helpers import captured_output, print_captured, print_error
+from print_tables import print_accounts_summary
+
+ACCOUNT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _resolve(value: Optional[str]) -> Optional[str]:
+    """Reads values written as '$NAME' from the environment, so secrets can stay out of the file."""
+    if value and value.startswith("$"):
+        return os.getenv(value[1:])
+    return value
+
+
+def _to_account(index: int, entry: Dict[str, Any]) -> Account:
+    name = str(entry.get("name") or f"account{index + 1}")
+    if not ACCOUNT_NAME_PATTERN.match(name):
+        raise ValueError(f"Account name '{name}' may only contain letters, digits, '.', '_' and '-'")
+    token, gist_id = _resolve(entry.get("readwise_token")), _resolve(entry.get("gist_id"))
+    if not (token and gist_id):
+        raise ValueError(f"Account '{name}' needs a readwise_token and a gist_id")
+    return Account(
+        name=name,
+        readwise_token=token,
+        gist_id=gist_id,
+        openai_api_token=_resolve(entry.get("openai_api_token")),
+    )
+
+
+def load_accounts(path: str) -> List[Account]:
+    """Loads account configurations from a JSON list of objects."""
+    with open(path, encoding="utf-8") as f:
+        accounts = [_to_account(index, entry) for index, entry in enumerate(json.load(f))]
+    names = [account.name for account in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError("Account names must be unique")
+    return accounts
+
+
+def _run_account(account: Account, run_pass: Callable[[], Optional[str]]) -> Tuple[AccountResult, str]:
+    """Runs one pass as the account, buffering its output and tallying its counters."""
+    CURRENT_ACCOUNT.set(account)
+    start = time.perf_counter()
+    latest, succeeded = None, True
+    with scoped_counters() as counters, captured_output() as output:
+        try:
+            latest = run_pass()
+        except Exception as e:
+            succeeded = False
+            print_error(f"Account run failed: {e}")
+    result = AccountResult(
+        name=account.name,
+        succeeded=succeeded,
+        seconds=time.perf_counter() - start,
+        counters=dict(counters),
+        latest=latest,
+    )
+    return result, output.getvalue()
+
+
+def run_accounts(accounts: List[Account], run_pass: Callable[[], Optional[str]]) -> Optional[str]:
+    """Runs a pass for every account with bounded parallelism and prints a per-account summary.
+
+    Each account runs in its own context, so it gets its own token, gist, OpenAI key, state directory
+    and rate limiter. Returns the latest updated_at processed by any account.
+    """
+    results: Dict[str, AccountResult] = {}
+    with ThreadPoolExecutor(max_workers=load_account_concurrency()) as pool:
+        futures = [
+            pool.submit(copy_context().run, _run_account, account, run_pass) for account in accounts
+        ]
+        for future in as_completed(futures):
+            result, output = future.result()
+            results[result.name] = result
+            print_captured(f"Account: {result.name}", output)
+
+    print_accounts_summary([results[account.name] for account in accounts])
+    return max(filter(None, (result.latest for result in results.values())), default=None)
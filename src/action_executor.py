@@ -0,0 +1,42 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, List, Tuple, TypeVar
+
+from config import load_action_workers
+from metrics import increment
+from print_helpers import print_error
+from profiler import profile_task
+
+T = TypeVar("T")
+
+
+def _run_safely(action: Callable[[T], bool], item: T) -> bool:
+    """Runs a single action, treating any exception as a failure."""
+    try:
+        return bool(action(item))
+    except Exception as e:
+        increment("action_failures")
+        print_error(f"Action failed for {item}: {e}")
+        return False
+
+
+def create_pool() -> ThreadPoolExecutor:
+    """Creates the worker pool used for delete and update actions."""
+    return ThreadPoolExecutor(max_workers=load_action_workers())
+
+
+def submit_actions(
+    pool: ThreadPoolExecutor, items: List[T], action: Callable[[T], bool]
+) -> List["Future[bool]"]:
+    """Queues an action for every item without waiting for the results.
+
+    Each task runs in a copy of the caller's context, so the current account and profiled stage carry over.
+    """
+    return [pool.submit(copy_context().run, profile_task, _run_safely, action, item) for item in items]
+
+
+def count_results(futures: List["Future[bool]"]) -> Tuple[int, int]:
+    """Waits for queued actions and returns success and failure counts."""
+    succeeded = sum(future.result() for future in futures)
+    return succeeded, len(futures) - succeeded
+
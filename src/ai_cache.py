@@ -0,0 +1,95 @@
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, List, Set
+
+from metrics import increment
+from print_helpers import print_warning
+from state_store import shared_state_path
+
+CACHE_FILE = "ai_verdicts.sqlite3"
+CACHE_TTL_DAYS = 30
+CACHE_MAX_ENTRIES = 50_000
+LOOKUP_BATCH_SIZE = 500
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_topics(topics: List[str]) -> str:
+    """Hashes the topic list so that editing the topics invalidates cached verdicts."""
+    return hash_text(json.dumps(sorted(topics), ensure_ascii=False))
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(shared_state_path(CACHE_FILE))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS verdicts ("
+        "summary_hash TEXT NOT NULL, topics_hash TEXT NOT NULL, "
+        "excluded INTEGER NOT NULL, created_at REAL NOT NULL, "
+        "PRIMARY KEY (summary_hash, topics_hash))"
+    )
+    return conn
+
+
+def _query_batch(
+    conn: sqlite3.Connection, summary_hashes: List[str], topics_hash: str
+) -> Dict[str, bool]:
+    placeholders = ",".join("?" * len(summary_hashes))
+    rows = conn.execute(
+        f"SELECT summary_hash, excluded FROM verdicts WHERE topics_hash = ? "
+        f"AND created_at >= ? AND summary_hash IN ({placeholders})",
+        [topics_hash, time.time() - CACHE_TTL_DAYS * 86400, *summary_hashes],
+    )
+    return {summary_hash: bool(excluded) for summary_hash, excluded in rows}
+
+
+def lookup_verdicts(documents: List[Dict[str, str]], topics: List[str]) -> Dict[str, bool]:
+    """Returns cached verdicts (excluded or not) by document ID for documents seen before."""
+    hashes = {doc["id"]: hash_text(doc["summary"]) for doc in documents}
+    unique_hashes = list(set(hashes.values()))
+    verdicts: Dict[str, bool] = {}
+    try:
+        with _connect() as conn:
+            for start in range(0, len(unique_hashes), LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[start : start + LOOKUP_BATCH_SIZE]
+                verdicts.update(_query_batch(conn, batch, hash_topics(topics)))
+    except sqlite3.Error as e:
+        print_warning(f"AI verdict cache unavailable: {e}")
+    cached = {doc_id: verdicts[h] for doc_id, h in hashes.items() if h in verdicts}
+    increment("ai_cache_hits", len(cached))
+    increment("ai_cache_misses", len(documents) - len(cached))
+    return cached
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    """Drops expired verdicts and the oldest ones beyond the size limit."""
+    conn.execute(
+        "DELETE FROM verdicts WHERE created_at < ?",
+        [time.time() - CACHE_TTL_DAYS * 86400],
+    )
+    conn.execute(
+        "DELETE FROM verdicts WHERE rowid IN (SELECT rowid FROM verdicts "
+        "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+        [CACHE_MAX_ENTRIES],
+    )
+
+
+def store_verdicts(
+    documents: List[Dict[str, str]], excluded_ids: Set[str], topics: List[str]
+) -> None:
+    """Stores the model's verdict for every document it was asked about."""
+    topics_hash = hash_topics(topics)
+    now = time.time()
+    rows = [
+        (hash_text(doc["summary"]), topics_hash, int(doc["id"] in excluded_ids), now)
+        for doc in documents
+    ]
+    try:
+        with _connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)", rows)
+            _evict(conn)
+    except sqlite3.Error as e:
+        print_warning(f"Could not store AI verdicts: {e}")
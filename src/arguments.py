@@ -0,0 +1,62 @@
+import argparse
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Clean and save Readwise Reader feed items based on filters from a GitHub gist."
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Identify documents to act on but do not actually perform the action.",
+    )
+    parser.add_argument(
+        "--updated-after",
+        type=str,
+        default=None,
+        help="Only fetch documents updated after this ISO 8601 date",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process the feed page by page, acting on each page while later pages download.",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        type=str,
+        default=None,
+        help="Directory for metrics.json and metrics.prom (defaults to the state directory).",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep running and poll the feed on an adaptive interval until SIGTERM.",
+    )
+    parser.add_argument(
+        "--accounts",
+        type=str,
+        default=None,
+        help="JSON file listing several accounts to process concurrently in one invocation.",
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Process a large window in bounded, checkpointed batches that resume after an interruption.",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Delete near-duplicate documents within the fetched batch, keeping one copy.",
+    )
+    parser.add_argument(
+        "--dedupe-history",
+        action="store_true",
+        help="Like --dedupe, but also catch duplicates of documents kept by earlier runs.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record CPU profiles and allocations per stage and print the hot spots (combine with --dry-run).",
+    )
+    return parser.parse_args()
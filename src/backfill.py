@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from action_executor import count_results, create_pool
+from config import load_backfill_batch_limits
+from data_types import DedupeIndex, Document
+from date_helpers import latest_updated_at
+from decision_engine import plan_actions
+from journaled_actions import submit_plan
+from dedupe import BACKFILL_INDEX_FILE, load_entries, save_entries
+from filtering import required_fields
+from journal import compact_journal
+from readwise_client import iter_feed_cursor_pages
+from state_store import state_path
+from print_helpers import (
+    print_backfill_summary,
+    print_bold,
+    print_dry_run_plan,
+    print_error,
+    print_info,
+    print_warning,
+)
+
+CHECKPOINT_FILE = "backfill.json"
+
+
+def _document_bytes(document: Document) -> int:
+    return sys.getsizeof(document) + sum(sys.getsizeof(value) for value in document)
+
+
+def load_checkpoint() -> Optional[Dict[str, Any]]:
+    """Loads the checkpoint an interrupted backfill left behind, if any."""
+    try:
+        with open(state_path(CHECKPOINT_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        print_warning(f"Ignoring unreadable backfill checkpoint: {e}")
+        return None
+
+
+def _save_checkpoint(checkpoint: Dict[str, Any]) -> None:
+    path = state_path(CHECKPOINT_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _clear_checkpoint() -> None:
+    for filename in (CHECKPOINT_FILE, BACKFILL_INDEX_FILE):
+        if os.path.exists(path := state_path(filename)):
+            os.remove(path)
+
+
+def _iter_batches(
+    updated_after: str, fields: FrozenSet[str], cursor: Optional[str]
+) -> Iterator[Tuple[List[Document], Optional[str]]]:
+    """Groups feed pages into batches bounded by document count and estimated memory.
+
+    Each batch comes with the cursor to resume from once it is done, or None after the last page.
+    """
+    max_documents, max_bytes = load_backfill_batch_limits()
+    batch: List[Document] = []
+    batch_bytes = 0
+    for page, next_cursor in iter_feed_cursor_pages(updated_after, fields, cursor):
+        batch += page
+        batch_bytes += sum(map(_document_bytes, page))
+        if next_cursor and (len(batch) >= max_documents or batch_bytes >= max_bytes):
+            yield batch, next_cursor
+            batch, batch_bytes = [], 0
+    yield batch, None
+
+
+def run_backfill(
+    updated_after: str,
+    filters: Dict[str, List[str]],
+    dry_run: bool = False,
+    dedupe_index: Optional[DedupeIndex] = None,
+) -> Optional[str]:
+    """Processes the feed in bounded batches, checkpointing the page cursor and totals after each one.
+
+    A checkpoint for the same updated_after is resumed. Returns the latest updated_at once the feed is done.
+    """
+    checkpoint = load_checkpoint()
+    if checkpoint and checkpoint["updated_after"] == updated_after:
+        print_bold(f"Resuming backfill after batch {checkpoint['batches']} ({checkpoint['documents']} documents)...")
+        if dedupe_index:
+            load_entries(dedupe_index, BACKFILL_INDEX_FILE)
+    else:
+        print_bold(f"Starting backfill of documents updated after {updated_after}...")
+        checkpoint = {
+            "updated_after": updated_after,
+            "cursor": None,
+            "batches": 0,
+            "documents": 0,
+            "deleted": 0,
+            "moved": 0,
+            "failed": 0,
+            "latest": None,
+        }
+
+    fields = required_fields(filters, dedupe=bool(dedupe_index))
+    try:
+        with create_pool() as pool:
+            for batch, cursor in _iter_batches(updated_after, fields, checkpoint["cursor"]):
+                plan = plan_actions(batch, filters, dedupe_index)
+                if dry_run:
+                    print_dry_run_plan(batch, plan)
+                    deleted, moved, failed = 0, 0, 0
+                else:
+                    delete_futures, save_futures = submit_plan(pool, plan)
+                    deleted, delete_failed = count_results(delete_futures)
+                    moved, save_failed = count_results(save_futures)
+                    failed = delete_failed + save_failed
+                    compact_journal()
+                checkpoint.update(
+                    cursor=cursor,
+                    batches=checkpoint["batches"] + 1,
+                    documents=checkpoint["documents"] + len(batch),
+                    deleted=checkpoint["deleted"] + deleted,
+                    moved=checkpoint["moved"] + moved,
+                    failed=checkpoint["failed"] + failed,
+                    latest=max(filter(None, [checkpoint["latest"], latest_updated_at(batch)]), default=None),
+                )
+                print_info(
+                    f"Batch {checkpoint['batches']}: {len(batch)} documents, {deleted} deleted, "
+                    f"{moved} moved, {failed} failed."
+                )
+                if cursor and not dry_run:
+                    if dedupe_index:
+                        save_entries(dedupe_index, BACKFILL_INDEX_FILE)
+                    _save_checkpoint(checkpoint)
+    except Exception as e:
+        print_error(f"Backfill stopped: {e}. Run --backfill again to continue from the last checkpoint.")
+        return None
+
+    print_backfill_summary(checkpoint)
+    if not dry_run:
+        _clear_checkpoint()
+    return checkpoint["latest"]
@@ -1,17 +1,8 @@
-from typing import List, Optional, Dict, Any, Tuple, Set
+from typing import List, Dict, Tuple, Set
 
-from filtering import filter_documents
-from readwise_client import delete_document, fetch_feed_documents
-from openai_client import filter_by_topic
-from data_types import FilterConfig
-from print_helpers import (
-    print_warning,
-    print_error,
-    print_bold,
-    print_info,
-    print_dry_run,
-    print_cleanup_summary,
-)
+from openai_client import filter_by_topic, estimate_ai_workload
+from data_types import Document, FilterConfig
+from print_helpers import print_error
 
 
 def has_active_filters(filters: Dict[str, List[str]]) -> bool:
@@ -19,14 +10,7 @@ def has_active_filters(filters: Dict[str, List[str]]) -> bool:
     return any(filters.values())
 
 
-def delete_documents(ids_to_delete: List[str]) -> Tuple[int, int]:
-    """Delete documents by ID and return counts of successful and failed deletions."""
-    deleted = sum(1 for doc_id in ids_to_delete if delete_document(doc_id))
-    failed = len(ids_to_delete) - deleted
-    return deleted, failed
-
-
-def _prepare_filters(filters: Dict[str, List[str]]) -> FilterConfig:
+def prepare_filters(filters: Dict[str, List[str]]) -> FilterConfig:
     """Extract and prepare filters, returning FilterConfig object."""
     ai_exclude_topics = filters.get("ai_topic_exclude", [])
     standard_filters = {k: v for k, v in filters.items() if k != "ai_topic_exclude"}
@@ -41,18 +25,8 @@ def _prepare_filters(filters: Dict[str, List[str]]) -> FilterConfig:
     )
 
 
-def _apply_standard_filters(
-    documents: List[Dict[str, Any]], filter_config: FilterConfig
-) -> Set[str]:
-    """Apply standard keyword/pattern filters to documents and return matching IDs."""
-    if not filter_config.has_standard_filters:
-        return set()
-
-    return set(filter_documents(documents, filter_config.standard_filters))
-
-
-def _apply_ai_filters(
-    documents: List[Dict[str, Any]], filter_config: FilterConfig
+def apply_ai_filters(
+    documents: List[Document], filter_config: FilterConfig
 ) -> Set[str]:
     """Apply AI-based topic filtering to documents and return matching IDs."""
     if not filter_config.has_ai_filters:
@@ -65,41 +39,10 @@ def _apply_ai_filters(
         return set()
 
 
-def _collect_documents_to_delete(
-    documents: List[Dict[str, Any]], filter_config: FilterConfig
-) -> Tuple[List[str], int]:
-    """Process documents with filters and return IDs to delete and AI filter count."""
-    standard_filtered_ids = _apply_standard_filters(documents, filter_config)
-    ai_filtered_ids = _apply_ai_filters(documents, filter_config)
-    all_ids_to_delete = list(standard_filtered_ids | ai_filtered_ids)
-    return all_ids_to_delete, len(ai_filtered_ids)
-
-
-def run_cleanup(
-    documents: List[Dict[str, Any]],
-    filters: Dict[str, List[str]],
-    dry_run: bool = False,
-) -> None:
-    """Process documents with configured filters and delete matching items."""
-    print_bold("Starting Readwise Reader cleanup...")
-
-    filter_config = _prepare_filters(filters)
-    if not filter_config.is_valid:
-        print_warning("No active filters found. Exiting.")
-        return
-
-    ids_to_delete, ai_filtered_count = _collect_documents_to_delete(
-        documents, filter_config
-    )
-    if not ids_to_delete:
-        print_info("No documents matched any filter criteria.")
-        return
-
-    if dry_run:
-        print_dry_run(documents, ids_to_delete)
-        return
-
-    deleted_count, failed_count = delete_documents(ids_to_delete)
-    print_cleanup_summary(
-        len(ids_to_delete), deleted_count, failed_count, ai_filtered_count
-    )
+def estimate_ai_savings(
+    documents: List[Document], undecided: List[Document]
+) -> Tuple[int, int]:
+    """Estimate the AI calls and tokens avoided by not sending already decided documents."""
+    all_calls, all_tokens = estimate_ai_workload(documents)
+    undecided_calls, undecided_tokens = estimate_ai_workload(undecided)
+    return all_calls - undecided_calls, all_tokens - undecided_tokens
@@ -1,37 +1,73 @@
 import os
 import json
-from typing import Optional, Dict, List, Any
-import requests
+from typing import Optional, Dict, List, Any, Tuple
 
-from dotenv import load_dotenv
+from contextvars import ContextVar
+from data_types import Account
 from print_helpers import print_warning
 
-load_dotenv(override=True)
+
+def _load_env_file() -> None:
+    """Loads the nearest .env file above this module, importing dotenv only when one exists."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        path = os.path.join(directory, ".env")
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+
+            load_dotenv(path, override=True)
+            return
+        if (parent := os.path.dirname(directory)) == directory:
+            return
+        directory = parent
+
+
+_load_env_file()
 
 DEFAULT_FILTERS = {
     "title_exclude": [],
     "url_exclude": [],
+    "domain_exclude": [],
     "author_exclude": [],
     "ai_topic_exclude": [],
     "author_save_inbox": [],
     "author_save_later": [],
 }
 
+DEFAULT_READWISE_BASE_URL = "https://readwise.io/api/v3"
+DEFAULT_GIST_API_URL = "https://api.github.com/gists"
+DEFAULT_ACTION_WORKERS = 4
+DEFAULT_READWISE_REQUESTS_PER_MINUTE = 50
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_AI_MAX_CONCURRENCY = 4
+DEFAULT_AI_SUMMARY_MAX_CHARS = 600
+DEFAULT_POLL_MIN_SECONDS = 60
+DEFAULT_POLL_MAX_SECONDS = 900
+DEFAULT_ACCOUNT_CONCURRENCY = 2
+DEFAULT_LOCAL_MODEL_EXCLUDE_THRESHOLD = 0.95
+DEFAULT_LOCAL_MODEL_KEEP_THRESHOLD = 0.05
+DEFAULT_LOCAL_MODEL_MIN_EXAMPLES = 200
+# Off by default: character n-grams miss documents that share no wording with a topic
+DEFAULT_PREFILTER_MIN_SIMILARITY = 0.0
+DEFAULT_BACKFILL_BATCH_SIZE = 1_000
+DEFAULT_BACKFILL_BATCH_MEMORY_MB = 64
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".state")
+
 USER_PROMPT = (
-    "Below is a list of documents, each with an 'id' and a 'summary'.\n"
+    "Exclusion topics: {exclude_topics}\n"
     "Documents: {documents}\n\n"
     "Your task is to identify which documents should be excluded based on the exclusion topics."
 )
 
 SYSTEM_PROMPT = (
     "You are an expert AI assistant for document filtering.\n"
-    "You will receive a list of documents, each with an 'id' and a 'summary'.\n"
+    "You will receive a JSON list of documents, each with a numeric id 'i' and a summary 's'.\n"
     "You will also receive a list of exclusion topics.\n\n"
     "Exclusion topics are examples of what to filter out. They may be specific (e.g., 'articles about video games other than Nintendo Switch') "
     "or general (e.g., 'artiklar om teater').\n"
     "For each document, check if its main topic matches or is closely related to any exclusion topic. "
     "Exclude documents if their summary is about, related to, or a clear example of an exclusion topic.\n\n"
-    "Return a JSON object with a single key 'matching_ids', whose value is a list of document 'id' strings "
+    "Return a JSON object with a single key 'matching_ids', whose value is a list of the numeric document 'i' values "
     "for all documents that should be excluded. Only include IDs that match.\n\n"
     "If no documents match, return an empty list. Do not include any explanation or extra text.\n\n"
     "Here are some example exclusion topics for reference: ['articles about video games other than Nintendo Switch', "
@@ -39,8 +75,14 @@ SYSTEM_PROMPT = (
 )
 
 
+# Set while an account is processed in multi-account mode; the loaders below read its settings
+CURRENT_ACCOUNT: ContextVar[Optional[Account]] = ContextVar("current_account", default=None)
+
+
 def load_readwise_api_token() -> str:
-    """Loads the Readwise API token from environment variables."""
+    """Loads the Readwise API token of the current account or from environment variables."""
+    if account := CURRENT_ACCOUNT.get():
+        return account.readwise_token
     token = os.getenv("READWISE_API_TOKEN")
     if not token:
         raise ValueError("READWISE_API_TOKEN environment variable is not set")
@@ -48,13 +90,110 @@ def load_readwise_api_token() -> str:
 
 
 def load_openai_api_key() -> Optional[str]:
-    """Loads the OpenAI API key from environment variables."""
-    return os.getenv("OPENAI_API_TOKEN")
+    """Loads the OpenAI API key of the current account, falling back to environment variables."""
+    account = CURRENT_ACCOUNT.get()
+    return (account and account.openai_api_token) or os.getenv("OPENAI_API_TOKEN")
 
 
 def load_gist_id() -> str:
-    """Loads the GitHub Gist ID from environment variables."""
+    """Loads the GitHub Gist ID of the current account or from environment variables."""
+    if account := CURRENT_ACCOUNT.get():
+        return account.gist_id
     gist_id = os.getenv("GIST_ID")
     if not gist_id:
         raise ValueError("GIST_ID environment variable is not set")
     return gist_id
+
+
+def _load_number(name: str, default: float) -> float:
+    """Loads a positive number from an environment variable, falling back to a default."""
+    try:
+        value = float(os.getenv(name, default))
+    except ValueError:
+        print_warning(f"{name} is not a number, using {default}")
+        return default
+    return value if value > 0 else default
+
+
+def load_action_workers() -> int:
+    """Loads the number of concurrent workers used for delete and update actions."""
+    return int(_load_number("ACTION_WORKERS", DEFAULT_ACTION_WORKERS))
+
+
+def load_readwise_requests_per_minute() -> float:
+    """Loads the request budget shared by all Readwise API calls."""
+    return _load_number(
+        "READWISE_REQUESTS_PER_MINUTE", DEFAULT_READWISE_REQUESTS_PER_MINUTE
+    )
+
+
+def load_http_pool_size() -> int:
+    """Loads the number of keep-alive connections kept per HTTP session."""
+    return int(_load_number("HTTP_POOL_SIZE", DEFAULT_HTTP_POOL_SIZE))
+
+
+def load_shared_state_dir() -> str:
+    """Loads the directory where state shared by all accounts is kept between runs."""
+    return os.getenv("STATE_DIR") or os.path.normpath(DEFAULT_STATE_DIR)
+
+
+def load_state_dir() -> str:
+    """Loads the directory where state is kept between runs, one subdirectory per account."""
+    if account := CURRENT_ACCOUNT.get():
+        return os.path.join(load_shared_state_dir(), "accounts", account.name)
+    return load_shared_state_dir()
+
+
+def load_ai_max_concurrency() -> int:
+    """Loads how many AI topic analysis requests may run at the same time."""
+    return int(_load_number("AI_MAX_CONCURRENCY", DEFAULT_AI_MAX_CONCURRENCY))
+
+
+def load_ai_summary_max_chars() -> int:
+    """Loads the maximum summary length sent to the AI topic filter."""
+    return int(_load_number("AI_SUMMARY_MAX_CHARS", DEFAULT_AI_SUMMARY_MAX_CHARS))
+
+
+def load_poll_interval_bounds() -> Tuple[float, float]:
+    """Loads the shortest and longest wait between feed polls in --serve mode."""
+    shortest = _load_number("POLL_MIN_SECONDS", DEFAULT_POLL_MIN_SECONDS)
+    longest = _load_number("POLL_MAX_SECONDS", DEFAULT_POLL_MAX_SECONDS)
+    return shortest, max(shortest, longest)
+
+
+def load_account_concurrency() -> int:
+    """Loads how many accounts are processed at the same time in multi-account mode."""
+    return int(_load_number("ACCOUNT_CONCURRENCY", DEFAULT_ACCOUNT_CONCURRENCY))
+
+
+def load_local_model_settings() -> Tuple[float, float, int]:
+    """Loads the local model's exclude and keep probability thresholds and its minimum training examples.
+
+    Documents scoring between the two thresholds are sent to OpenAI.
+    """
+    exclude = _load_number("LOCAL_MODEL_EXCLUDE_THRESHOLD", DEFAULT_LOCAL_MODEL_EXCLUDE_THRESHOLD)
+    keep = _load_number("LOCAL_MODEL_KEEP_THRESHOLD", DEFAULT_LOCAL_MODEL_KEEP_THRESHOLD)
+    min_examples = int(_load_number("LOCAL_MODEL_MIN_EXAMPLES", DEFAULT_LOCAL_MODEL_MIN_EXAMPLES))
+    return exclude, min(keep, exclude), min_examples
+
+
+def load_prefilter_min_similarity() -> float:
+    """Loads the lowest summary-to-topic similarity for which a document is still sent to the AI; 0 disables it."""
+    return _load_number("AI_PREFILTER_MIN_SIMILARITY", DEFAULT_PREFILTER_MIN_SIMILARITY)
+
+
+def load_backfill_batch_limits() -> Tuple[int, int]:
+    """Loads the most documents and the most memory (in bytes) one --backfill batch may hold."""
+    size = int(_load_number("BACKFILL_BATCH_SIZE", DEFAULT_BACKFILL_BATCH_SIZE))
+    memory_mb = _load_number("BACKFILL_BATCH_MEMORY_MB", DEFAULT_BACKFILL_BATCH_MEMORY_MB)
+    return size, int(memory_mb * 1024 * 1024)
+
+
+def load_readwise_base_url() -> str:
+    """Loads the Readwise API base URL, overridable to point at a local stand-in."""
+    return os.getenv("READWISE_BASE_URL") or DEFAULT_READWISE_BASE_URL
+
+
+def load_gist_api_url() -> str:
+    """Loads the GitHub gists API URL, overridable to point at a local stand-in."""
+    return os.getenv("GIST_API_URL") or DEFAULT_GIST_API_URL
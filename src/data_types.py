@@ -1,4 +1,15 @@
-from typing import NamedTuple, Dict, List
+from typing import Any, NamedTuple, Dict, FrozenSet, List, Optional, Tuple
+
+
+class Document(NamedTuple):
+    """Compact feed document holding only the fields the cleaner reads."""
+
+    id: str
+    title: str
+    source_url: str
+    author: str
+    summary: str
+    updated_at: str
 
 
 class SaveAction(NamedTuple):
@@ -22,9 +33,84 @@ class FilterConfig(NamedTuple):
         return self.has_standard_filters or self.has_ai_filters
 
 
+class ActionPlan(NamedTuple):
+    """Data transfer object for the deduplicated actions decided for a set of documents."""
+
+    delete_ids: List[str]
+    save_actions: List[SaveAction]
+    ai_filtered_count: int
+    ai_calls_saved: int
+    ai_tokens_saved: int
+    duplicate_count: int
+
+
+class DedupeIndex(NamedTuple):
+    """SimHash fingerprints of kept documents, bucketed by band for locality-sensitive lookups."""
+
+    fingerprints: Dict[str, int]
+    urls: Dict[str, str]
+    buckets: Dict[Tuple[int, int], List[str]]
+    seen_at: Dict[str, float]
+
+
+class Account(NamedTuple):
+    """Credentials and filter gist for one Readwise account in multi-account mode."""
+
+    name: str
+    readwise_token: str
+    gist_id: str
+    openai_api_token: Optional[str]
+
+
+class AccountResult(NamedTuple):
+    """Outcome of one account's pass, for the multi-account summary."""
+
+    name: str
+    succeeded: bool
+    seconds: float
+    counters: Dict[str, float]
+    latest: Optional[str]
+
+
 class ModelConfig(NamedTuple):
     """Data transfer object for model configuration."""
 
     name: str
     input_cost_per_million: float
     output_cost_per_million: float
+
+
+class Matcher(NamedTuple):
+    """Compiled Aho-Corasick automaton for case-insensitive substring matching."""
+
+    goto: List[Dict[str, int]]
+    fail: List[int]
+    terminal: List[bool]
+    match_all: bool
+
+
+class AuthorRule(NamedTuple):
+    """Author filter split into a hash set of exact names and an automaton for substrings."""
+
+    exact: FrozenSet[str]
+    substring: Matcher
+
+
+class FilterMatchers(NamedTuple):
+    """Compiled matchers for each filter, built once per run."""
+
+    title_exclude: Matcher
+    url_exclude: Matcher
+    domain_exclude: FrozenSet[str]
+    author_exclude: AuthorRule
+    author_save_later: AuthorRule
+    author_save_inbox: AuthorRule
+
+
+class AiRequest(NamedTuple):
+    """Shared state for the chunked requests of one AI topic analysis."""
+
+    client: Any
+    exclude_topics: List[str]
+    id_map: Dict[int, List[str]]
+    usage: List[Tuple[int, int]]
@@ -1,17 +1,30 @@
 from datetime import timezone, datetime, timedelta
-from dateutil import parser as date_parser
-from tzlocal import get_localzone
+from typing import List, Optional
+
+from data_types import Document
 
 
 DEFAULT_HOURS_AGO = 2
+WATERMARK_OVERLAP_MINUTES = 10
+
+
+def _parse_datetime(date_str: str) -> datetime:
+    """Parses ISO 8601 with the standard library, loading dateutil only for other formats."""
+    try:
+        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    except ValueError:
+        from dateutil import parser as date_parser
+
+        return date_parser.parse(date_str)
 
 
 def parse_datetime_to_utc(date_str: str) -> str:
     """Parse a datetime string and convert to UTC ISO format."""
-    local_tz = get_localzone()
-    dt = date_parser.parse(date_str)
+    dt = _parse_datetime(date_str)
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=local_tz)
+        from tzlocal import get_localzone
+
+        dt = dt.replace(tzinfo=get_localzone())
 
     utc_dt = dt.astimezone(timezone.utc)
     return utc_dt.isoformat()
@@ -23,3 +36,16 @@ def get_default_updated_after() -> str:
         hours=DEFAULT_HOURS_AGO
     )  # running every 2 hours
     return past.replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+def get_watermark_updated_after(watermark: str) -> str:
+    """Get the ISO 8601 date to resume from, overlapping the watermark slightly."""
+    resume_from = _parse_datetime(watermark) - timedelta(
+        minutes=WATERMARK_OVERLAP_MINUTES
+    )
+    return resume_from.isoformat()
+
+
+def latest_updated_at(documents: List[Document]) -> Optional[str]:
+    """Get the most recent updated_at among the documents, if any."""
+    return max((doc.updated_at for doc in documents if doc.updated_at), default=None)
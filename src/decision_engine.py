@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional, Tuple
+
+from action_executor import count_results, create_pool
+from cleanup import apply_ai_filters, estimate_ai_savings, prepare_filters
+from data_types import ActionPlan, DedupeIndex, Document, FilterConfig, FilterMatchers, SaveAction
+from date_helpers import latest_updated_at
+from dedupe import find_duplicates
+from filtering import compile_filters, determine_save_location, matches_exclude
+from journal import compact_journal, record_watermark
+from journaled_actions import PlanFutures, submit_plan
+from metrics import timed
+from save import has_save_filters
+from print_helpers import (
+    print_bold,
+    print_info,
+    print_warning,
+    print_ai_savings,
+    print_dry_run_plan,
+    print_cleanup_summary,
+    print_save_summary,
+)
+
+
+def _evaluate_local_rules(
+    documents: List[Document], filter_config: FilterConfig, matchers: FilterMatchers
+) -> Tuple[List[str], List[Document], Dict[str, str]]:
+    """Single pass over the cheap rules: returns deletions, the documents kept and their save locations."""
+    delete_ids: List[str] = []
+    kept: List[Document] = []
+    locations: Dict[str, str] = {}
+    with timed("standard_filtering"):
+        for doc in documents:
+            if not doc.id:
+                continue
+            if filter_config.has_standard_filters and matches_exclude(doc, matchers):
+                delete_ids.append(doc.id)
+                continue
+            kept.append(doc)
+            if location := determine_save_location(doc, matchers):
+                locations[doc.id] = location
+    return delete_ids, kept, locations
+
+
+def _find_unsaved_duplicates(
+    index: DedupeIndex, documents: List[Document], locations: Dict[str, str]
+) -> List[str]:
+    """Finds duplicates to delete, never deleting a document a save filter asked to keep.
+
+    Documents with a save location are indexed first, so the saved copy is the one kept.
+    """
+    saved_first = sorted(documents, key=lambda doc: doc.id not in locations)
+    return [doc_id for doc_id in find_duplicates(index, saved_first) if doc_id not in locations]
+
+
+def plan_actions(
+    documents: List[Document],
+    filters: Dict[str, List[str]],
+    dedupe_index: Optional[DedupeIndex] = None,
+) -> ActionPlan:
+    """Evaluates every document once against all rules and resolves them into one action per document.
+
+    Deletion wins over saving, and "later" wins over "inbox", so no document is both deleted and moved.
+    With a dedupe index, near-duplicates of kept documents are deleted next. Only the documents no rule
+    has decided, neither deleted nor saved, go on to the AI stage.
+    """
+    filter_config = prepare_filters(filters)
+    matchers = compile_filters(filters)
+    delete_ids, kept, locations = _evaluate_local_rules(documents, filter_config, matchers)
+
+    duplicate_ids = _find_unsaved_duplicates(dedupe_index, kept, locations) if dedupe_index else []
+    delete_ids += duplicate_ids
+    decided = set(duplicate_ids) | locations.keys()
+    undecided = [doc for doc in kept if doc.id not in decided]
+
+    ai_ids = apply_ai_filters(undecided, filter_config)
+    ai_delete_ids = [doc.id for doc in undecided if doc.id in ai_ids]
+    calls_saved, tokens_saved = (
+        estimate_ai_savings(documents, undecided) if filter_config.has_ai_filters else (0, 0)
+    )
+    return ActionPlan(
+        delete_ids=delete_ids + ai_delete_ids,
+        save_actions=[SaveAction(doc_id=doc_id, location=location) for doc_id, location in locations.items()],
+        ai_filtered_count=len(ai_delete_ids),
+        ai_calls_saved=calls_saved,
+        ai_tokens_saved=tokens_saved,
+        duplicate_count=len(duplicate_ids),
+    )
+
+
+def print_plan_notes(plan: ActionPlan) -> None:
+    if plan.ai_calls_saved or plan.ai_tokens_saved:
+        print_ai_savings(plan.ai_calls_saved, plan.ai_tokens_saved)
+    if plan.duplicate_count:
+        print_info(f"Marked {plan.duplicate_count} near-duplicate documents for deletion.")
+
+
+def print_plan_summary(filters: Dict[str, List[str]], plan: ActionPlan, futures: PlanFutures) -> None:
+    """Prints the cleanup and save summaries for the rule types that are active."""
+    delete_futures, save_futures = futures
+    if prepare_filters(filters).is_valid or delete_futures:
+        deleted, failed = count_results(delete_futures)
+        print_cleanup_summary(len(delete_futures), deleted, failed, plan.ai_filtered_count, plan.duplicate_count)
+    if has_save_filters(filters):
+        updated, failed = count_results(save_futures)
+        print_save_summary(len(save_futures), updated, failed)
+
+
+def run_plan(
+    documents: List[Document],
+    filters: Dict[str, List[str]],
+    dry_run: bool = False,
+    dedupe_index: Optional[DedupeIndex] = None,
+) -> None:
+    """Plans cleanup and save actions for the documents in one pass, then executes or prints the plan."""
+    print_bold("Starting Readwise Reader cleanup and save...")
+
+    if not (prepare_filters(filters).is_valid or has_save_filters(filters) or dedupe_index):
+        print_warning("No active filters found. Exiting.")
+        return
+
+    plan = plan_actions(documents, filters, dedupe_index)
+    print_plan_notes(plan)
+    if not (plan.delete_ids or plan.save_actions):
+        print_info("No documents matched any filter criteria.")
+        return
+
+    if dry_run:
+        print_dry_run_plan(documents, plan)
+        return
+
+    with create_pool() as pool:
+        futures = submit_plan(pool, plan)
+        record_watermark(latest_updated_at(documents))
+        print_plan_summary(filters, plan, futures)
+    compact_journal()
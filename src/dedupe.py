@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from data_types import DedupeIndex, Document
+from metrics import timed
+from print_helpers import print_warning
+from state_store import state_path
+
+INDEX_FILE = "dedupe_index.json"
+# The index of a backfill in progress, so a resumed backfill still knows the copies it kept
+BACKFILL_INDEX_FILE = "backfill_dedupe_index.json"
+FINGERPRINT_BITS = 64
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+# With 4 bands, fingerprints this close always share at least one band, so no candidate is missed
+MAX_HAMMING_DISTANCE = 3
+# Shorter texts give unreliable fingerprints; they are only matched by URL
+MIN_FEATURES = 8
+HISTORY_TTL_DAYS = 14
+HISTORY_MAX_ENTRIES = 50_000
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid", "ref"})
+
+
+def canonical_url(url: str) -> str:
+    """Reduces a URL to host, path and non-tracking query, ignoring scheme, 'www.' and fragments."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return ""
+    if not parts.hostname:
+        return ""
+    host = parts.hostname.removeprefix("www.")
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not (key.lower().startswith("utm_") or key.lower() in TRACKING_PARAMS)
+        )
+    )
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+
+def simhash(text: str) -> Optional[int]:
+    """Fingerprints text from its words and word pairs; similar texts differ in few bits."""
+    # Only --dedupe needs NumPy, so it isn't loaded at startup
+    import numpy as np
+
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+    if len(features) < MIN_FEATURES:
+        return None
+    digests = b"".join(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest() for feature in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, FINGERPRINT_BITS // 8), axis=1)
+    # A position is set if most features set it
+    return int.from_bytes(np.packbits(bits.sum(axis=0) > len(features) / 2).tobytes(), "big")
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    mask = (1 << BAND_BITS) - 1
+    return [(band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+
+def _add(index: DedupeIndex, doc_id: str, fingerprint: Optional[int], url: str, seen_at: float) -> None:
+    if fingerprint is not None:
+        index.fingerprints[doc_id] = fingerprint
+        for key in _bands(fingerprint):
+            index.buckets.setdefault(key, []).append(doc_id)
+    if url:
+        index.urls.setdefault(url, doc_id)
+    index.seen_at[doc_id] = seen_at
+
+
+def _find_match(index: DedupeIndex, doc_id: str, fingerprint: Optional[int], url: str) -> Optional[str]:
+    """Returns a different indexed document with the same URL or a near-identical fingerprint."""
+    if url and index.urls.get(url, doc_id) != doc_id:
+        return index.urls[url]
+    if fingerprint is None:
+        return None
+    candidates: Set[str] = set()
+    for key in _bands(fingerprint):
+        candidates.update(index.buckets.get(key, ()))
+    candidates.discard(doc_id)
+    return next(
+        (
+            other
+            for other in candidates
+            if bin(fingerprint ^ index.fingerprints[other]).count("1") <= MAX_HAMMING_DISTANCE
+        ),
+        None,
+    )
+
+
+def find_duplicates(index: DedupeIndex, documents: List[Document]) -> List[str]:
+    """Returns IDs of documents duplicating one already indexed; the first copy is kept and indexed."""
+    duplicate_ids = []
+    now = time.time()
+    with timed("dedupe"):
+        for doc in documents:
+            fingerprint = simhash(f"{doc.title} {doc.summary}")
+            url = canonical_url(doc.source_url)
+            if _find_match(index, doc.id, fingerprint, url):
+                duplicate_ids.append(doc.id)
+            elif doc.id not in index.seen_at:
+                _add(index, doc.id, fingerprint, url, now)
+    return duplicate_ids
+
+
+def create_index() -> DedupeIndex:
+    return DedupeIndex(fingerprints={}, urls={}, buckets={}, seen_at={})
+
+
+def load_entries(index: DedupeIndex, filename: str = INDEX_FILE) -> DedupeIndex:
+    """Adds the unexpired entries saved in a state file to the index."""
+    try:
+        with open(state_path(filename), encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return index
+    except (OSError, json.JSONDecodeError) as e:
+        print_warning(f"Ignoring unreadable dedupe index: {e}")
+        return index
+    cutoff = time.time() - HISTORY_TTL_DAYS * 86400
+    for doc_id, fingerprint, url, seen_at in entries:
+        if seen_at >= cutoff and doc_id not in index.seen_at:
+            _add(index, doc_id, fingerprint, url, seen_at)
+    return index
+
+
+def load_index() -> DedupeIndex:
+    """Loads the persisted index of documents kept by earlier runs, dropping expired entries."""
+    return load_entries(create_index())
+
+
+def save_index(index: DedupeIndex) -> None:
+    """Persists the most recently seen entries for later runs."""
+    save_entries(index, INDEX_FILE)
+
+
+def save_entries(index: DedupeIndex, filename: str) -> None:
+    """Writes the most recently seen entries of the index to a state file."""
+    urls_by_id: Dict[str, str] = {doc_id: url for url, doc_id in index.urls.items()}
+    newest = sorted(index.seen_at.items(), key=lambda item: item[1], reverse=True)[:HISTORY_MAX_ENTRIES]
+    entries = [
+        [doc_id, index.fingerprints.get(doc_id), urls_by_id.get(doc_id, ""), seen_at]
+        for doc_id, seen_at in newest
+        if doc_id in index.fingerprints or doc_id in urls_by_id
+    ]
+    path = state_path(filename)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,30 @@
+from typing import FrozenSet, List
+from urllib.parse import urlsplit
+
+
+def _normalize_domain(entry: str) -> str:
+    """Reduces a configured entry such as 'https://www.Example.com/path' or '*.example.com' to its host."""
+    entry = entry.strip().lower()
+    host = urlsplit(entry).hostname if "://" in entry else entry.split("/", 1)[0]
+    return (host or "").lstrip("*.").rstrip(".")
+
+
+def build_domain_index(domains: List[str]) -> FrozenSet[str]:
+    """Builds a hash set of blocked domains; lookups cost the same regardless of its size."""
+    return frozenset(filter(None, (_normalize_domain(d) for d in domains)))
+
+
+def extract_host(url: str) -> str:
+    """Parses the lowercase host out of a URL, or returns an empty string."""
+    try:
+        return (urlsplit(url).hostname or "").rstrip(".")
+    except ValueError:
+        return ""
+
+
+def host_in_index(host: str, index: FrozenSet[str]) -> bool:
+    """Checks the host and each parent domain, so 'a.bad.com' matches 'bad.com' but 'notbad.com' doesn't."""
+    if not host or not index:
+        return False
+    labels = host.split(".")
+    return any(".".join(labels[i:]) in index for i in range(len(labels)))
@@ -1,63 +1,88 @@
-from typing import Any, Dict, List, Optional
-from print_helpers import print_warning
+from typing import Dict, FrozenSet, List, Optional
+import hashlib
+import json
+import threading
 
+from data_types import Document, FilterMatchers
+from domain_index import build_domain_index, extract_host, host_in_index
+from matcher import compile_author_rule, compile_patterns, matches, matches_author
 
-def _check_match(text: str, filters: List[str]) -> bool:
-    """Checks if the text contains any of the filter strings."""
-    if not filters:
-        return False
+# A few gists' worth; --serve keeps compiling as the filters change
+MAX_COMPILED = 8
 
-    text = text.lower()
-    return any(f.lower() in text for f in filters)
+_LOCK = threading.Lock()
+_COMPILED: Dict[str, FilterMatchers] = {}
 
 
-def filter_documents(
-    documents: List[Dict[str, Any]],
-    filters: Dict[str, List[str]],
-) -> List[str]:
-    """Filters documents based on criteria defined in the filters dictionary."""
-    title_filters = filters.get("title_exclude", [])
-    url_filters = filters.get("url_exclude", [])
-    author_filters = filters.get("author_exclude", [])
+def _filters_hash(filters: Dict[str, List[str]]) -> str:
+    relevant = {key: filters.get(key, []) for key in FilterMatchers._fields}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
 
-    if not any([title_filters, url_filters, author_filters]):
-        print_warning("No filter values provided in the configuration.")
-        return []
 
-    matching_ids = []
-    for doc in documents:
-        if doc_id := doc.get("id"):
-            title = doc.get("title", "")
-            url = doc.get("source_url", "")
-            author = doc.get("author", "")
+def _build_matchers(filters: Dict[str, List[str]]) -> FilterMatchers:
+    return FilterMatchers(
+        title_exclude=compile_patterns(filters.get("title_exclude", [])),
+        url_exclude=compile_patterns(filters.get("url_exclude", [])),
+        domain_exclude=build_domain_index(filters.get("domain_exclude", [])),
+        author_exclude=compile_author_rule(filters.get("author_exclude", [])),
+        author_save_later=compile_author_rule(filters.get("author_save_later", [])),
+        author_save_inbox=compile_author_rule(filters.get("author_save_inbox", [])),
+    )
 
-            if (
-                _check_match(title, title_filters)
-                or _check_match(url, url_filters)
-                or _check_match(author, author_filters)
-            ):
-                matching_ids.append(doc_id)
 
-    return matching_ids
+def compile_filters(filters: Dict[str, List[str]]) -> FilterMatchers:
+    """Returns matchers for the filters, reusing ones already compiled from identical content."""
+    key = _filters_hash(filters)
+    with _LOCK:
+        if key in _COMPILED:
+            return _COMPILED[key]
+    matchers = _build_matchers(filters)
+    with _LOCK:
+        if len(_COMPILED) >= MAX_COMPILED:
+            _COMPILED.pop(next(iter(_COMPILED)))
+        _COMPILED[key] = matchers
+    return matchers
+
+
+def required_fields(filters: Dict[str, List[str]], dedupe: bool = False) -> FrozenSet[str]:
+    """Returns the document fields the active filters read; the rest can be dropped on arrival."""
+    fields = {"id", "title", "updated_at"}
+    if dedupe:
+        fields.update({"summary", "source_url"})
+    if filters.get("url_exclude") or filters.get("domain_exclude"):
+        fields.add("source_url")
+    if any(filters.get(key) for key in ("author_exclude", "author_save_inbox", "author_save_later")):
+        fields.add("author")
+    if filters.get("ai_topic_exclude"):
+        fields.add("summary")
+    return frozenset(fields)
+
+
+def matches_exclude(document: Document, matchers: FilterMatchers) -> bool:
+    """Checks whether any title, URL, domain or author exclude filter matches the document."""
+    return (
+        matches(matchers.title_exclude, document.title)
+        or matches(matchers.url_exclude, document.source_url)
+        or host_in_index(extract_host(document.source_url), matchers.domain_exclude)
+        or matches_author(matchers.author_exclude, document.author)
+    )
 
 
 def determine_save_location(
-    document: Dict[str, Any],
-    filters: Dict[str, List[str]],
+    document: Document,
+    matchers: FilterMatchers,
 ) -> Optional[str]:
     """Determines if a document should be saved and to what location."""
-    author = document.get("author", "")
+    author = document.author
     if not author:
         return None
 
     # Check "later" filters first (they take precedence)
-    if later_filters := filters.get("author_save_later", []):
-        if _check_match(author, later_filters):
-            return "later"
+    if matches_author(matchers.author_save_later, author):
+        return "later"
 
     # Then check "inbox" filters
-    if inbox_filters := filters.get("author_save_inbox", []):
-        if _check_match(author, inbox_filters):
-            return "new"  # "new" corresponds to inbox in Readwise
+    if matches_author(matchers.author_save_inbox, author):
+        return "new"  # "new" corresponds to inbox in Readwise
 
     return None
@@ -1,11 +1,23 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import json
+import threading
+import time
 
 import requests
 
-from config import load_gist_id, DEFAULT_FILTERS
+from config import load_gist_id, load_gist_api_url, DEFAULT_FILTERS
+from state_store import shared_state_path
+from print_helpers import print_info, print_warning
 
-BASE_URL = "https://api.github.com/gists"
+BASE_URL = load_gist_api_url()
+REQUEST_TIMEOUT = 30
+# Accounts sharing a gist within one batch reuse a download this recent without asking GitHub again
+REUSE_SECONDS = 30
+
+# Guards the two dicts; each gist has its own lock, so accounts with different gists fetch in parallel
+_LOCK = threading.Lock()
+_GIST_LOCKS: Dict[str, threading.Lock] = {}
+_RECENT: Dict[str, Tuple[float, str]] = {}
 
 HEADERS = {
     "Accept": "application/vnd.github+json",
@@ -13,23 +25,67 @@ HEADERS = {
 }
 
 
-def load_filters() -> Dict[str, List[str]]:
-    """Loads filters from the GitHub gist."""
+def _cache_file(gist_id: str) -> str:
+    return shared_state_path(f"gist_{gist_id}.json")
+
+
+def _read_cached_gist(gist_id: str) -> Optional[Dict[str, str]]:
+    """Reads the last downloaded gist content and its ETag; a malformed cache counts as no cache."""
+    try:
+        with open(_cache_file(gist_id), encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    etag, content = cached.get("etag"), cached.get("content")
+    return {"etag": etag, "content": content} if isinstance(etag, str) and isinstance(content, str) else None
+
+
+def _write_cached_gist(gist_id: str, etag: str, content: str) -> None:
     try:
-        gist_id = load_gist_id()
+        with open(_cache_file(gist_id), "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "content": content}, f)
+    except OSError as e:
+        print_warning(f"Could not cache the gist: {e}")
+
+
+def _fetch_gist_content(gist_id: str) -> str:
+    """Fetches the gist's first file, reusing the cached copy when GitHub answers 304."""
+    cached = _read_cached_gist(gist_id)
+    headers = {**HEADERS, "If-None-Match": cached["etag"]} if cached else HEADERS
+
+    response = requests.get(f"{BASE_URL}/{gist_id}", headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304 and cached:
+        print_info("Filters unchanged since last run, using cached gist.")
+        return cached["content"]
+    response.raise_for_status()
 
-        api_url = f"{BASE_URL}/{gist_id}"
+    # Get the first file in the gist
+    file_content = next(iter(response.json()["files"].values()))["content"]
+    if etag := response.headers.get("ETag"):
+        _write_cached_gist(gist_id, etag, file_content)
+    return file_content
 
-        response = requests.get(api_url, headers=HEADERS)
-        response.raise_for_status()
 
-        gist_data = response.json()
+def _gist_content(gist_id: str) -> str:
+    """Returns the gist content, fetching it at most once per batch even when accounts share it."""
+    with _LOCK:
+        gist_lock = _GIST_LOCKS.setdefault(gist_id, threading.Lock())
+    with gist_lock:
+        with _LOCK:
+            fetched_at, content = _RECENT.get(gist_id, (0.0, ""))
+        if time.monotonic() - fetched_at <= REUSE_SECONDS:
+            return content
+        content = _fetch_gist_content(gist_id)
+        with _LOCK:
+            _RECENT[gist_id] = (time.monotonic(), content)
+        return content
 
-        # Get the first file in the gist
-        file_content = next(iter(gist_data["files"].values()))["content"]
-        loaded_data = json.loads(file_content)
 
-        # Ensure all default keys are present, using gist data if available
-        return {key: loaded_data.get(key, []) for key in DEFAULT_FILTERS}
-    except Exception as e:
-        raise e
+def load_filters() -> Dict[str, List[str]]:
+    """Loads filters from the GitHub gist."""
+    loaded_data = json.loads(_gist_content(load_gist_id()))
+
+    # Ensure all default keys are present, using gist data if available
+    return {key: loaded_data.get(key, []) for key in DEFAULT_FILTERS}
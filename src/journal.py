@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from data_types import ActionPlan, SaveAction
+from print_helpers import print_warning
+from state_store import state_path
+
+JOURNAL_FILE = "action_journal.jsonl"
+
+_LOCK = threading.Lock()
+
+
+def _append(record: Dict[str, Any]) -> None:
+    """Appends one record and flushes it, so it survives the process being killed right after."""
+    with _LOCK, open(state_path(JOURNAL_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+
+
+def _plan_record(plan: ActionPlan) -> Dict[str, Any]:
+    return {"op": "plan", "delete": plan.delete_ids, "save": [list(action) for action in plan.save_actions]}
+
+
+def record_plan(plan: ActionPlan) -> None:
+    """Writes the plan's actions ahead of executing any of them."""
+    if plan.delete_ids or plan.save_actions:
+        _append(_plan_record(plan))
+
+
+def record_done(kind: str, doc_id: str) -> None:
+    """Marks an action as finished; actions without this record are retried by the next run."""
+    _append({"op": "done", "kind": kind, "id": doc_id})
+
+
+def record_watermark(updated_at: Optional[str]) -> None:
+    """Notes the watermark to store once every planned action is done."""
+    if updated_at:
+        _append({"op": "watermark", "updated_at": updated_at})
+
+
+def _read_records() -> List[Dict[str, Any]]:
+    records = []
+    try:
+        with open(state_path(JOURNAL_FILE), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a torn last line
+                    print_warning("Skipping a truncated action journal entry.")
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def load_pending() -> Tuple[ActionPlan, Optional[str]]:
+    """Returns the planned actions without a completion record, and the latest journaled watermark."""
+    deletes: Dict[str, None] = {}
+    saves: Dict[str, str] = {}
+    watermark: Optional[str] = None
+    for record in _read_records():
+        if record.get("op") == "plan":
+            deletes.update(dict.fromkeys(record.get("delete", [])))
+            saves.update({doc_id: location for doc_id, location in record.get("save", [])})
+        elif record.get("op") == "done":
+            (deletes if record.get("kind") == "delete" else saves).pop(record.get("id"), None)
+        elif record.get("op") == "watermark":
+            watermark = max(filter(None, [watermark, record.get("updated_at")]))
+    plan = ActionPlan(
+        delete_ids=list(deletes),
+        save_actions=[SaveAction(doc_id=doc_id, location=location) for doc_id, location in saves.items()],
+        ai_filtered_count=0,
+        ai_calls_saved=0,
+        ai_tokens_saved=0,
+        duplicate_count=0,
+    )
+    return plan, watermark
+
+
+def compact_journal() -> None:
+    """Rewrites the journal to hold only unfinished actions, removing it once everything is done."""
+    plan, watermark = load_pending()
+    path = state_path(JOURNAL_FILE)
+    with _LOCK:
+        if not (plan.delete_ids or plan.save_actions):
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(_plan_record(plan)) + "\n")
+            if watermark:
+                f.write(json.dumps({"op": "watermark", "updated_at": watermark}) + "\n")
+        os.replace(tmp_path, path)
@@ -0,0 +1,73 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+import requests
+
+from action_executor import count_results, create_pool, submit_actions
+from data_types import ActionPlan, SaveAction
+from journal import compact_journal, load_pending, record_done, record_plan
+from print_helpers import print_bold, print_cleanup_summary, print_info, print_save_summary
+from readwise_client import delete_document, update_document
+from state_store import save_watermark
+
+PlanFutures = Tuple[List["Future[bool]"], List["Future[bool]"]]
+
+
+def _run_journaled(kind: str, doc_id: str, action: Callable[[], Any]) -> bool:
+    """Runs an action and journals it as done only once it succeeded, so failures are retried by the next run.
+
+    A 404 means the document is gone and no retry can help, so that failure is journaled as done too.
+    """
+    try:
+        action()
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            record_done(kind, doc_id)
+        raise
+    record_done(kind, doc_id)
+    return True
+
+
+def _delete_journaled(doc_id: str) -> bool:
+    return _run_journaled("delete", doc_id, lambda: delete_document(doc_id))
+
+
+def _save_journaled(action: SaveAction) -> bool:
+    return _run_journaled("save", action.doc_id, lambda: update_document(action.doc_id, action.location))
+
+
+def _submit_journaled(pool: ThreadPoolExecutor, plan: ActionPlan) -> PlanFutures:
+    delete_futures = submit_actions(pool, plan.delete_ids, _delete_journaled)
+    save_futures = submit_actions(pool, plan.save_actions, _save_journaled)
+    return delete_futures, save_futures
+
+
+def submit_plan(pool: ThreadPoolExecutor, plan: ActionPlan) -> PlanFutures:
+    """Journals the plan's deletions and location updates, then queues them on the worker pool."""
+    record_plan(plan)
+    return _submit_journaled(pool, plan)
+
+
+def resume_pending_actions(dry_run: bool = False) -> None:
+    """Finishes actions an interrupted run journaled but never completed, without refetching or AI calls."""
+    pending, watermark = load_pending()
+    if not (pending.delete_ids or pending.save_actions):
+        return
+    print_bold(
+        f"Resuming {len(pending.delete_ids)} deletions and {len(pending.save_actions)} location updates "
+        "from an interrupted run..."
+    )
+    if dry_run:
+        print_info("Dry run enabled. Unfinished actions stay in the journal.")
+        return
+
+    compact_journal()
+    with create_pool() as pool:
+        delete_futures, save_futures = _submit_journaled(pool, pending)
+        if delete_futures:
+            print_cleanup_summary(len(delete_futures), *count_results(delete_futures))
+        if save_futures:
+            print_save_summary(len(save_futures), *count_results(save_futures))
+    if watermark:
+        save_watermark(watermark)
+    compact_journal()
@@ -0,0 +1,163 @@
+import os
+import re
+import tempfile
+import threading
+import zipfile
+import zlib
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+import numpy as np
+
+from ai_cache import hash_topics
+from config import load_local_model_settings
+from metrics import increment, timed
+from print_helpers import print_warning
+from state_store import shared_state_path
+
+FEATURE_BITS = 18
+LEARNING_RATE = 0.5
+L2_PENALTY = 1e-6
+EPOCHS = 3
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class LocalModel(NamedTuple):
+    """Logistic regression over hashed words, trained online from the AI's verdicts for one topic list.
+
+    Training returns a new model, so a model is never changed while it is classifying.
+    """
+
+    weights: np.ndarray
+    bias: float = 0.0
+    examples: float = 0.0
+    positives: float = 0.0
+
+
+SAVED_FIELDS = ("bias", "examples", "positives")
+
+_MODELS: Dict[str, LocalModel] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashes words and word pairs into signed, length-normalised feature buckets."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    buckets: Dict[int, float] = {}
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        index = h & ((1 << FEATURE_BITS) - 1)
+        buckets[index] = buckets.get(index, 0.0) + (1.0 if h >> 31 else -1.0)
+    indices = np.fromiter(buckets.keys(), dtype=np.int64, count=len(buckets))
+    values = np.fromiter(buckets.values(), dtype=np.float64, count=len(buckets))
+    return indices, values / max(1.0, float(np.sqrt(len(buckets))))
+
+
+def _sigmoid(score: float) -> float:
+    return float(1.0 / (1.0 + np.exp(-np.clip(score, -30, 30))))
+
+
+def _probability(model: LocalModel, indices: np.ndarray, values: np.ndarray) -> float:
+    return _sigmoid(float(model.weights[indices] @ values) + model.bias)
+
+
+def _model_path(topics: List[str]) -> str:
+    return shared_state_path(f"local_model_{hash_topics(topics)[:16]}.npz")
+
+
+def _fresh_model() -> LocalModel:
+    return LocalModel(weights=np.zeros(1 << FEATURE_BITS))
+
+
+def _load_model(topics: List[str]) -> LocalModel:
+    model = _fresh_model()
+    try:
+        with np.load(_model_path(topics)) as saved:
+            if saved["weights"].shape != model.weights.shape:
+                raise ValueError("unexpected weights shape")
+            return model._replace(weights=saved["weights"], **{key: float(saved[key]) for key in SAVED_FIELDS})
+    except FileNotFoundError:
+        return model
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+        # A truncated file from an interrupted save or cache restore; start over rather than fail every pass
+        print_warning(f"Ignoring unreadable local model, starting a fresh one: {e}")
+        return model
+
+
+def get_model(topics: List[str]) -> LocalModel:
+    """Returns the in-memory model for the topic list, loading it from the state directory once."""
+    key = hash_topics(topics)
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            _MODELS[key] = _load_model(topics)
+        return _MODELS[key]
+
+
+def save_model(topics: List[str]) -> None:
+    """Writes the model through a temporary file; a failed save only loses this pass's training."""
+    model = get_model(topics)
+    path = _model_path(topics)
+    tmp_path = ""
+    # Accounts sharing the topic list share the file, so saves are serialised and use unique temporary files
+    with _MODELS_LOCK:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, weights=model.weights, **{key: getattr(model, key) for key in SAVED_FIELDS})
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print_warning(f"Could not save the local model: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def trained(model: LocalModel, examples: List[Tuple[np.ndarray, np.ndarray, float]]) -> LocalModel:
+    """Returns the model after a few SGD passes over (features, label) examples."""
+    weights, bias = model.weights.copy(), model.bias
+    for _ in range(EPOCHS):
+        for indices, values, label in examples:
+            error = _sigmoid(float(weights[indices] @ values) + bias) - label
+            weights[indices] -= LEARNING_RATE * (error * values + L2_PENALTY * weights[indices])
+            bias -= LEARNING_RATE * error
+    return LocalModel(
+        weights=weights,
+        bias=bias,
+        examples=model.examples + len(examples),
+        positives=model.positives + sum(label for _, _, label in examples),
+    )
+
+
+def learn_verdicts(documents: List[Dict[str, str]], excluded_ids: Set[str], topics: List[str]) -> None:
+    """Trains the topic list's model on new (summary, verdict) pairs from the AI."""
+    model = get_model(topics)
+    examples = [(*_features(doc["summary"]), float(doc["id"] in excluded_ids)) for doc in documents]
+    # Held while training, so concurrent batches for the same topics don't overwrite each other's updates
+    with _MODELS_LOCK, timed("local_model_training"):
+        _MODELS[hash_topics(topics)] = trained(_MODELS.get(hash_topics(topics), model), examples)
+
+
+def classify_confident(
+    documents: List[Dict[str, str]], topics: List[str]
+) -> Tuple[List[str], List[Dict[str, str]]]:
+    """Decides the documents the model is confident about.
+
+    Returns the IDs it excludes and the documents that still need the AI. Until the model has seen
+    enough verdicts of both kinds, every document is left to the AI. Its verdicts are guesses, so they
+    are not cached: later passes score the documents again with the model as it has improved by then.
+    """
+    exclude_threshold, keep_threshold, min_examples = load_local_model_settings()
+    model = get_model(topics)
+    if model.examples < min_examples or model.positives in (0, model.examples):
+        return [], documents
+
+    excluded_ids: List[str] = []
+    uncertain: List[Dict[str, str]] = []
+    with timed("local_model_inference"):
+        for doc in documents:
+            probability = _probability(model, *_features(doc["summary"]))
+            if probability >= exclude_threshold:
+                excluded_ids.append(doc["id"])
+            elif probability > keep_threshold:
+                uncertain.append(doc)
+    increment("local_model_decisions", len(documents) - len(uncertain))
+    return excluded_ids, uncertain
@@ -1,73 +1,167 @@
 import argparse
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, FrozenSet, List
 
+from data_types import DedupeIndex, Document
+from filtering import required_fields
 from github_gist_client import load_filters
-from cleanup import run_cleanup
-from save import run_save
-from date_helpers import parse_datetime_to_utc, get_default_updated_after
+from decision_engine import run_plan
+from journaled_actions import resume_pending_actions
+from streaming import run_streaming
+from service import run_service
+from accounts import load_accounts, run_accounts
+from dedupe import create_index, load_index, save_index
+from backfill import load_checkpoint, run_backfill
+from date_helpers import (
+    parse_datetime_to_utc,
+    get_default_updated_after,
+    get_watermark_updated_after,
+    latest_updated_at,
+)
+from state_store import load_watermark, save_watermark
 from readwise_client import fetch_feed_documents
-from print_helpers import print_error
-
-
-def _parse_arguments() -> argparse.Namespace:
-    """Parses command-line arguments."""
-    parser = argparse.ArgumentParser(
-        description="Clean and save Readwise Reader feed items based on filters from a GitHub gist."
-    )
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Identify documents to act on but do not actually perform the action.",
-    )
-    parser.add_argument(
-        "--updated-after",
-        type=str,
-        default=None,
-        help="Only fetch documents updated after this ISO 8601 date",
-    )
-    return parser.parse_args()
-
-
-def _parse_updated_after(updated_after: Optional[str]) -> str:
-    """Parse the updatedAfter argument and convert to UTC."""
-    date = updated_after or get_default_updated_after()
-    return parse_datetime_to_utc(date)
+from print_helpers import print_error, print_info
+from metrics import export_metrics, timed
+from profiler import profiled, start_profiling, write_profile_report
+from config import CURRENT_ACCOUNT, load_state_dir
+from arguments import parse_arguments
+
+
+def _parse_updated_after(updated_after: Optional[str], backfill: bool = False) -> str:
+    """Parse the updatedAfter argument and convert to UTC, resuming from the watermark by default.
+
+    Without an argument, --backfill continues an interrupted backfill first.
+    """
+    if updated_after:
+        return parse_datetime_to_utc(updated_after)
+    if backfill and (checkpoint := load_checkpoint()):
+        return checkpoint["updated_after"]
+    if watermark := load_watermark():
+        return get_watermark_updated_after(watermark)
+    return parse_datetime_to_utc(get_default_updated_after())
+
+
+def _record_watermark(latest: Optional[str], dry_run: bool) -> None:
+    """Persist the latest processed updated_at so the next run starts from there."""
+    if latest and not dry_run:
+        save_watermark(latest)
 
 
 def _get_filters() -> Dict[str, List[str]]:
     """Get filters from the GitHub gist."""
     try:
-        return load_filters()
+        with timed("gist_load"):
+            return load_filters()
     except Exception as e:
         print_error(f"Error loading filters: {e}")
         return {}
 
 
-def _get_documents(updated_after: str) -> List[Dict[str, Any]]:
+def _get_documents(updated_after: str, fields: FrozenSet[str]) -> List[Document]:
     """Get documents from the Readwise Reader API."""
     try:
-        return fetch_feed_documents(updated_after)
+        return fetch_feed_documents(updated_after, fields)
     except Exception as e:
         print_error(f"Error fetching documents: {e}")
         return []
 
 
-def main() -> None:
-    """Main function to orchestrate the script."""
-    args = _parse_arguments()
-    updated_after = _parse_updated_after(args.updated_after)
+def _report_empty_window(serve: bool) -> None:
+    # When polling, an empty window is the normal idle case rather than an error
+    if serve:
+        print_info("No new documents.")
+    else:
+        print_error("Cannot proceed - no documents found")
 
-    if not (filters := _get_filters()):
+
+def _open_dedupe_index(args: argparse.Namespace) -> Optional[DedupeIndex]:
+    if args.dedupe_history:
+        return load_index()
+    return create_index() if args.dedupe else None
+
+
+def _run_pass(args: argparse.Namespace, updated_after: str) -> Optional[str]:
+    """Runs one cleanup and save pass over the feed, returning the latest updated_at processed."""
+    with profiled("load_filters"):
+        filters = _get_filters()
+    if not filters:
         print_error("Cannot proceed - no valid filters found")
+        return None
+
+    with profiled("load_state"):
+        dedupe_index = _open_dedupe_index(args)
+    if args.backfill:
+        with profiled("backfill"):
+            latest = run_backfill(updated_after, filters, args.dry_run, dedupe_index)
+    elif args.stream:
+        with profiled("stream"):
+            latest = run_streaming(updated_after, filters, args.dry_run, dedupe_index)
+    else:
+        fields = required_fields(filters, dedupe=bool(dedupe_index))
+        with profiled("fetch"):
+            documents = _get_documents(updated_after, fields)
+        if not documents:
+            _report_empty_window(args.serve)
+            return None
+        with profiled("plan_and_act"):
+            run_plan(documents, filters, args.dry_run, dedupe_index)
+        latest = latest_updated_at(documents)
+
+    with profiled("save_state"):
+        if dedupe_index and args.dedupe_history and not args.dry_run:
+            save_index(dedupe_index)
+        _record_watermark(latest, args.dry_run)
+    return latest
+
+
+def _account_pass(args: argparse.Namespace, latest_by_account: Dict[str, str]) -> Optional[str]:
+    """Runs one pass for the current account, resuming from that account's own journal and watermark.
+
+    --updated-after only applies to an account's first pass; later --serve passes continue from what it processed.
+    """
+    with profiled("resume"):
+        resume_pending_actions(args.dry_run)
+    account = CURRENT_ACCOUNT.get()
+    name = account.name if account else ""
+    if name in latest_by_account:
+        updated_after = get_watermark_updated_after(latest_by_account[name])
+    else:
+        updated_after = _parse_updated_after(args.updated_after, args.backfill)
+    if latest := _run_pass(args, updated_after):
+        latest_by_account[name] = max(latest, latest_by_account.get(name, latest))
+    return latest
+
+
+def _run(args: argparse.Namespace) -> None:
+    """Runs a single pass, or keeps polling in --serve mode, for one account or all of --accounts."""
+    if args.accounts:
+        try:
+            accounts = load_accounts(args.accounts)
+        except (OSError, ValueError) as e:
+            print_error(f"Cannot load accounts: {e}")
+            return
+        latest_by_account: Dict[str, str] = {}
+        run_pass = lambda _updated_after: run_accounts(accounts, lambda: _account_pass(args, latest_by_account))
+    else:
+        with profiled("resume"):
+            resume_pending_actions(args.dry_run)
+        run_pass = lambda updated_after: _run_pass(args, updated_after)
+
+    updated_after = _parse_updated_after(args.updated_after, args.backfill)
+    if args.serve:
+        run_service(run_pass, updated_after, args.metrics_dir or load_state_dir())
         return
+    run_pass(updated_after)
 
-    if not (documents := _get_documents(updated_after)):
-        print_error("Cannot proceed - no documents found")
-        return
 
-    run_cleanup(documents, filters, args.dry_run)
-    print()
-    run_save(documents, filters, args.dry_run)
+def main() -> None:
+    """Main function to orchestrate the script."""
+    args = parse_arguments()
+    if args.profile:
+        start_profiling()
+    with timed("run"):
+        _run(args)
+    export_metrics(args.metrics_dir or load_state_dir())
+    write_profile_report(args.metrics_dir or load_state_dir())
 
 
 if __name__ == "__main__":
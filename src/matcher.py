@@ -0,0 +1,76 @@
+from collections import deque
+from typing import Dict, List
+
+from data_types import AuthorRule, Matcher
+
+EXACT_PREFIX = "="
+
+
+def _build_trie(patterns: List[str]) -> Matcher:
+    """Builds the goto trie of the automaton, marking pattern ends as terminal."""
+    goto: List[Dict[str, int]] = [{}]
+    terminal = [False]
+    for pattern in patterns:
+        state = 0
+        for char in pattern:
+            if char not in goto[state]:
+                goto.append({})
+                terminal.append(False)
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        terminal[state] = True
+    return Matcher(goto=goto, fail=[0] * len(goto), terminal=terminal, match_all=False)
+
+
+def _link_failures(matcher: Matcher) -> Matcher:
+    """Adds Aho-Corasick failure links and propagates terminal states along them."""
+    goto, fail, terminal = matcher.goto, matcher.fail, matcher.terminal
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, child in goto[state].items():
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[child] = goto[fallback].get(char, 0)
+            terminal[child] = terminal[child] or terminal[fail[child]]
+            queue.append(child)
+    return matcher
+
+
+def compile_patterns(patterns: List[str]) -> Matcher:
+    """Compiles filter strings into a case-insensitive substring automaton."""
+    lowered = [p.lower() for p in patterns]
+    if "" in lowered:
+        # An empty filter string is a substring of everything
+        return Matcher(goto=[{}], fail=[0], terminal=[False], match_all=True)
+    return _link_failures(_build_trie(lowered))
+
+
+def matches(matcher: Matcher, text: str) -> bool:
+    """Checks in a single scan whether the text contains any compiled pattern."""
+    if matcher.match_all:
+        return True
+    goto, fail, terminal = matcher.goto, matcher.fail, matcher.terminal
+    state = 0
+    for char in text.lower():
+        while state and char not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(char, 0)
+        if terminal[state]:
+            return True
+    return False
+
+
+def compile_author_rule(patterns: List[str]) -> AuthorRule:
+    """Splits author filters into exact names (prefixed with '=') and substring patterns."""
+    exact = frozenset(
+        filter(None, (p[len(EXACT_PREFIX) :].strip().lower() for p in patterns if p.startswith(EXACT_PREFIX)))
+    )
+    substrings = [p for p in patterns if not p.startswith(EXACT_PREFIX)]
+    return AuthorRule(exact=exact, substring=compile_patterns(substrings))
+
+
+def matches_author(rule: AuthorRule, author: str) -> bool:
+    """Checks the exact-name set with one hash lookup before scanning for substrings."""
+    return author.strip().lower() in rule.exact or matches(rule.substring, author)
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+METRIC_PREFIX = "readwise_cleaner"
+
+_LOCK = threading.Lock()
+_COUNTERS: Dict[str, float] = {}
+_STAGES: Dict[str, Dict[str, float]] = {}
+_SCOPE: ContextVar[Optional[Dict[str, float]]] = ContextVar("metrics_scope", default=None)
+
+
+def increment(name: str, amount: float = 1) -> None:
+    """Adds to a named counter such as retries, 429s, bytes or tokens."""
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+        if (scope := _SCOPE.get()) is not None:
+            scope[name] = scope.get(name, 0) + amount
+
+
+@contextmanager
+def scoped_counters() -> Iterator[Dict[str, float]]:
+    """Also tallies counters incremented in this context, including from threads that copied it."""
+    tallies: Dict[str, float] = {}
+    token = _SCOPE.set(tallies)
+    try:
+        yield tallies
+    finally:
+        _SCOPE.reset(token)
+
+
+def record_duration(stage: str, seconds: float) -> None:
+    """Records one timed execution of a stage."""
+    with _LOCK:
+        stats = _STAGES.setdefault(stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Times the wrapped block as one execution of the stage, even if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_duration(stage, time.perf_counter() - start)
+
+
+def snapshot() -> Dict[str, Any]:
+    with _LOCK:
+        return {
+            "timestamp": time.time(),
+            "stages": {stage: dict(stats) for stage, stats in _STAGES.items()},
+            "counters": dict(_COUNTERS),
+        }
+
+
+def _to_prometheus(data: Dict[str, Any]) -> str:
+    lines = []
+    stage_metrics = [
+        ("stage_seconds_total", "counter", "total_seconds"),
+        ("stage_runs_total", "counter", "count"),
+        ("stage_max_seconds", "gauge", "max_seconds"),
+    ]
+    for metric, metric_type, field in stage_metrics:
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {metric_type}")
+        for stage, stats in sorted(data["stages"].items()):
+            lines.append(f'{METRIC_PREFIX}_{metric}{{stage="{stage}"}} {stats[field]:g}')
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+        lines.append(f"{METRIC_PREFIX}_{name}_total {value:g}")
+    lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}_last_run_timestamp_seconds {data['timestamp']:.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomically(path: str, content: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def export_metrics(directory: str) -> None:
+    """Writes the run's metrics as metrics.json and a Prometheus textfile (metrics.prom)."""
+    os.makedirs(directory, exist_ok=True)
+    data = snapshot()
+    _write_atomically(os.path.join(directory, "metrics.json"), json.dumps(data, indent=2))
+    _write_atomically(os.path.join(directory, "metrics.prom"), _to_prometheus(data))
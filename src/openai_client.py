@@ -1,64 +1,66 @@
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 import json
 
-from openai import OpenAI
-from openai.types.chat import ChatCompletionMessageParam
+import backoff
 
-from config import load_openai_api_key, USER_PROMPT, SYSTEM_PROMPT
-from print_helpers import print_warning, print_error, print_info
+from config import (
+    load_openai_api_key,
+    load_ai_max_concurrency,
+    load_ai_summary_max_chars,
+    USER_PROMPT,
+    SYSTEM_PROMPT,
+)
+from print_helpers import print_error, print_info
+
+from ai_cache import lookup_verdicts, store_verdicts
+from data_types import AiRequest, Document, ModelConfig
+from metrics import increment, record_duration, timed
+from profiler import profile_task
+from prompt_encoding import (
+    truncate_summary,
+    dedupe_summaries,
+    encode_documents,
+    decode_matching_ids,
+    expand_documents,
+    chunk_by_token_budget,
+    estimate_tokens,
+    parse_matching_ids,
+)
 
-from data_types import ModelConfig
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
 
 MODEL_CONFIG = ModelConfig(
     name="gpt-4.1-mini",
     input_cost_per_million=0.40,
     output_cost_per_million=1.60,
 )
+MAX_CHUNK_TRIES = 3
 
 
 def _build_prompt(
-    documents: List[Dict[str, str]], exclude_topics: List[str]
-) -> List[ChatCompletionMessageParam]:
+    documents: List[Dict[str, Any]], exclude_topics: List[str]
+) -> List["ChatCompletionMessageParam"]:
     return [
-        {
-            "role": "system",
-            "content": SYSTEM_PROMPT.format(exclude_topics=exclude_topics),
-        },
+        {"role": "system", "content": SYSTEM_PROMPT},
         {
             "role": "user",
             "content": USER_PROMPT.format(
-                documents=documents, exclude_topics=exclude_topics
+                documents=encode_documents(documents),
+                exclude_topics=json.dumps(exclude_topics, ensure_ascii=False),
             ),
         },
     ]
 
 
-def _handle_invalid_response() -> List[str]:
-    print_warning("'matching_ids' is not a list of strings in OpenAI response.")
-    return []
-
-
-def _parse_openai_response(response_content: Optional[str]) -> List[str]:
-    if not response_content:
-        print_warning("OpenAI response content is empty.")
-        return []
-    try:
-        ids = json.loads(response_content).get("matching_ids", [])
-        return (
-            ids
-            if isinstance(ids, list) and all(isinstance(i, str) for i in ids)
-            else _handle_invalid_response()
-        )
-    except json.JSONDecodeError:
-        print_error(f"Failed to decode JSON from OpenAI response: {response_content}")
-        return []
-
-
-def _filter_docs_for_prompt(documents: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def _filter_docs_for_prompt(documents: List[Document]) -> List[Dict[str, str]]:
+    max_chars = load_ai_summary_max_chars()
     return [
-        {"id": str(doc["id"]), "summary": str(doc["summary"])}
+        {"id": doc.id, "summary": truncate_summary(doc.summary, max_chars)}
         for doc in documents
-        if doc.get("id") and doc.get("summary")
+        if doc.id and doc.summary
     ]
 
 
@@ -69,23 +71,120 @@ def _print_usage(prompt_tokens: int, completion_tokens: int) -> None:
     print_info(f"AI Topic Analysis Cost: ${total_cost:.4f}")
 
 
-def filter_by_topic(
-    documents: List[Dict[str, Any]], exclude_topics: List[str]
-) -> List[str]:
-    api_key = load_openai_api_key()
-    docs_for_prompt = _filter_docs_for_prompt(documents)
+def _on_chunk_retry(details: Dict[str, Any]) -> None:
+    increment("ai_retries")
+    record_duration("retry_sleep", details["wait"])
+
 
+@backoff.on_predicate(
+    backoff.expo,
+    lambda result: result is None,
+    max_tries=MAX_CHUNK_TRIES,
+    on_backoff=_on_chunk_retry,
+    on_giveup=lambda details: print_error(
+        f"Giving up on AI chunk after {details['tries']} tries."
+    ),
+)
+def _classify_chunk(
+    request: AiRequest, chunk: List[Dict[str, Any]]
+) -> Optional[List[int]]:
+    """Asks the model which documents in a chunk match, returning None if no usable answer came back."""
     try:
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model=MODEL_CONFIG.name,
-            messages=_build_prompt(docs_for_prompt, exclude_topics),
-            temperature=0.2,
-            response_format={"type": "json_object"},
-        )
+        with timed("ai_request"):
+            response = request.client.chat.completions.create(
+                model=MODEL_CONFIG.name,
+                messages=_build_prompt(chunk, request.exclude_topics),
+                temperature=0.2,
+                response_format={"type": "json_object"},
+            )
         if response.usage:
-            _print_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
-        return _parse_openai_response(response.choices[0].message.content)
+            increment("ai_prompt_tokens", response.usage.prompt_tokens)
+            increment("ai_completion_tokens", response.usage.completion_tokens)
+            request.usage.append(
+                (response.usage.prompt_tokens, response.usage.completion_tokens)
+            )
+        return parse_matching_ids(response.choices[0].message.content)
     except Exception as e:
         print_error(f"Unexpected error during OpenAI analysis: {e}")
+        return None
+
+
+def _classify_and_cache(request: AiRequest, chunk: List[Dict[str, Any]]) -> List[str]:
+    """Classifies one chunk and caches its verdicts if the model answered."""
+    local_ids = _classify_chunk(request, chunk)
+    if local_ids is None:
         return []
+    from local_model import learn_verdicts
+
+    matching_ids = decode_matching_ids(local_ids, request.id_map)
+    documents = expand_documents(chunk, request.id_map)
+    store_verdicts(documents, set(matching_ids), request.exclude_topics)
+    learn_verdicts(documents, set(matching_ids), request.exclude_topics)
+    return matching_ids
+
+
+def _request_matching_ids(
+    docs_for_prompt: List[Dict[str, str]], exclude_topics: List[str]
+) -> List[str]:
+    """Sends deduplicated documents to the model in concurrent token-budgeted chunks and merges the results."""
+    # The SDK takes most of the startup time, so it is only imported once documents need classifying
+    from openai import OpenAI
+
+    compact_docs, id_map = dedupe_summaries(docs_for_prompt)
+    request = AiRequest(
+        client=OpenAI(api_key=load_openai_api_key()),
+        exclude_topics=exclude_topics,
+        id_map=id_map,
+        usage=[],
+    )
+    with ThreadPoolExecutor(max_workers=load_ai_max_concurrency()) as pool:
+        futures = [
+            pool.submit(copy_context().run, profile_task, _classify_and_cache, request, chunk)
+            for chunk in chunk_by_token_budget(compact_docs)
+        ]
+        matching_ids = [doc_id for future in futures for doc_id in future.result()]
+    if request.usage:
+        _print_usage(
+            sum(p for p, _ in request.usage), sum(c for _, c in request.usage)
+        )
+    return matching_ids
+
+
+def estimate_ai_workload(documents: List[Document]) -> Tuple[int, int]:
+    """Estimates the number of AI calls and prompt tokens needed for the documents, ignoring the cache."""
+    compact_docs, _ = dedupe_summaries(_filter_docs_for_prompt(documents))
+    chunks = chunk_by_token_budget(compact_docs)
+    return len(chunks), sum(estimate_tokens(encode_documents(chunk)) for chunk in chunks)
+
+
+def filter_by_topic(
+    documents: List[Document], exclude_topics: List[str]
+) -> List[str]:
+    docs_for_prompt = _filter_docs_for_prompt(documents)
+    cached = lookup_verdicts(docs_for_prompt, exclude_topics)
+    misses = [doc for doc in docs_for_prompt if doc["id"] not in cached]
+    print_info(f"AI verdict cache: {len(cached)} hits, {len(misses)} misses")
+
+    matching_ids = [doc_id for doc_id, excluded in cached.items() if excluded]
+    if not misses:
+        return matching_ids
+    # Both load NumPy, which is only needed once there are uncached documents to classify
+    from local_model import classify_confident, save_model
+    from relevance_prefilter import prefilter_relevant
+
+    relevant, skipped = prefilter_relevant(misses, exclude_topics)
+    if skipped:
+        print_info(f"Relevance prefilter skipped {skipped} documents unrelated to every topic")
+    if not relevant:
+        return matching_ids
+    local_ids, uncertain = classify_confident(relevant, exclude_topics)
+    if len(uncertain) < len(relevant):
+        print_info(
+            f"Local model decided {len(relevant) - len(uncertain)} documents "
+            f"({len(local_ids)} excluded); {len(uncertain)} sent to OpenAI"
+        )
+    if not uncertain:
+        return matching_ids + local_ids
+    ai_ids = _request_matching_ids(uncertain, exclude_topics)
+    save_model(exclude_topics)
+    return matching_ids + local_ids + ai_ids
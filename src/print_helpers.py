@@ -1,58 +1,117 @@
-from rich.console import Console
-from typing import List, Dict, Any
-from data_types import SaveAction
+import io
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+from data_types import ActionPlan, Document, SaveAction
 
-CONSOLE = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
+
+# Created on first print, so importing this module doesn't load rich
+CONSOLE: Optional["Console"] = None
+
+# Set while an account's output is buffered, so concurrent accounts don't interleave
+_CAPTURE: ContextVar[Optional["Console"]] = ContextVar("captured_console", default=None)
+
+
+def _default_console() -> "Console":
+    global CONSOLE
+    if CONSOLE is None:
+        from rich.console import Console
+
+        CONSOLE = Console()
+    return CONSOLE
+
+
+def _console() -> "Console":
+    return _CAPTURE.get() or _default_console()
+
+
+@contextmanager
+def captured_output() -> Iterator[io.StringIO]:
+    """Buffers everything printed in this context, including from threads that copied it."""
+    from rich.console import Console
+
+    buffer = io.StringIO()
+    default = _default_console()
+    token = _CAPTURE.set(
+        Console(
+            file=buffer,
+            force_terminal=default.is_terminal,
+            color_system=default.color_system,
+            width=default.width,
+        )
+    )
+    try:
+        yield buffer
+    finally:
+        _CAPTURE.reset(token)
+
+
+def print_table(table: "Table") -> None:
+    """Prints a rich table to the current console."""
+    _console().print(table)
 
 
 def print_warning(msg: str) -> None:
-    CONSOLE.print(f"[yellow]Warning: {msg}[/yellow]")
+    _console().print(f"[yellow]Warning: {msg}[/yellow]")
 
 
 def print_error(msg: str) -> None:
-    CONSOLE.print(f"[bold red]Error: {msg}[/bold red]")
+    _console().print(f"[bold red]Error: {msg}[/bold red]")
 
 
 def print_success(msg: str) -> None:
-    CONSOLE.print(f"[bold green]Success: {msg}[/bold green]")
+    _console().print(f"[bold green]Success: {msg}[/bold green]")
 
 
 def print_info(msg: str) -> None:
-    CONSOLE.print(f"[blue]Info:[/blue] {msg}")
+    _console().print(f"[blue]Info:[/blue] {msg}")
 
 
 def print_bold(msg: str) -> None:
-    CONSOLE.print(f"[bold]{msg}[/bold]")
+    _console().print(f"[bold]{msg}[/bold]")
 
 
 def print_neutral(msg: str) -> None:
-    CONSOLE.print(msg)
+    _console().print(msg)
 
 
-def print_dry_run(documents: List[Dict[str, Any]], ids_to_delete: List[str]) -> None:
+def print_dry_run(documents: List[Document], ids_to_delete: List[str]) -> None:
     print_info("Dry run enabled. No documents will be deleted.")
     print_bold("Documents flagged for deletion:")
+    flagged = set(ids_to_delete)
     [
-        print_neutral(f"  - {doc.get('title', 'N/A')} (ID: {doc.get('id')})")
+        print_neutral(f"  - {doc.title or 'N/A'} (ID: {doc.id})")
         for doc in documents
-        if doc.get("id") in ids_to_delete
+        if doc.id in flagged
     ]
 
 
 def print_cleanup_summary(
-    total: int, deleted: int, failed: int, from_ai: int = 0
+    total: int, deleted: int, failed: int, from_ai: int = 0, duplicates: int = 0
 ) -> None:
     print_bold("\n--- Cleanup Summary ---")
     print_neutral(f"Documents matching filters: {total}")
     if from_ai:
         print_neutral(f"  (Including {from_ai} identified by AI topic filter)")
+    if duplicates:
+        print_neutral(f"  (Including {duplicates} near-duplicates)")
     print_success(f"Deleted {deleted} documents")
     if failed:
         print_error(f"Failed to delete: {failed}")
 
 
+def print_ai_savings(calls: int, tokens: int) -> None:
+    """Prints the AI work avoided by documents that cheaper filters already matched."""
+    print_info(
+        f"Skipped AI analysis for already matched documents: ~{calls} calls, ~{tokens} tokens saved"
+    )
+
+
 def print_dry_run_save(
-    documents: List[Dict[str, Any]], actions: List[SaveAction]
+    documents: List[Document], actions: List[SaveAction]
 ) -> None:
     """Prints the summary of actions that would be taken in a save dry run."""
     print_info("Dry run enabled. No documents will be moved.")
@@ -60,13 +119,21 @@ def print_dry_run_save(
     action_map = {action.doc_id: action.location for action in actions}
     [
         print_neutral(
-            f"  - {doc.get('title', 'N/A')} (ID: {doc.get('id')}) -> Move to '{action_map[doc.get('id')]}'"
+            f"  - {doc.title or 'N/A'} (ID: {doc.id}) -> Move to '{action_map[doc.id]}'"
         )
         for doc in documents
-        if doc.get("id") in action_map
+        if doc.id in action_map
     ]
 
 
+def print_dry_run_plan(documents: List[Document], plan: ActionPlan) -> None:
+    """Prints every deletion and location update in the plan without performing them."""
+    if plan.delete_ids:
+        print_dry_run(documents, plan.delete_ids)
+    if plan.save_actions:
+        print_dry_run_save(documents, plan.save_actions)
+
+
 def print_save_summary(total: int, updated: int, failed: int) -> None:
     """Prints the summary after a save operation."""
     print_bold("\n--- Save Summary ---")
@@ -74,3 +141,20 @@ def print_save_summary(total: int, updated: int, failed: int) -> None:
     print_success(f"Successfully moved {updated} documents")
     if failed:
         print_error(f"Failed to move {failed} documents")
+
+
+def print_backfill_summary(totals: Dict[str, Any]) -> None:
+    """Prints the totals accumulated over all batches of a backfill, including resumed ones."""
+    print_bold("\n--- Backfill Summary ---")
+    print_neutral(f"Batches: {totals['batches']}")
+    print_neutral(f"Documents processed: {totals['documents']}")
+    print_success(f"Deleted {totals['deleted']} and moved {totals['moved']} documents")
+    if totals["failed"]:
+        print_error(f"Failed actions: {totals['failed']}")
+
+
+def print_captured(title: str, output: str) -> None:
+    """Writes a block of buffered output under a heading."""
+    print_bold(f"\n=== {title} ===")
+    _console().file.write(output)
+    _console().file.flush()
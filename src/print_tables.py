@@ -0,0 +1,55 @@
+from typing import Dict, List, Tuple
+
+from data_types import AccountResult
+from print_helpers import print_neutral, print_table
+
+
+def print_accounts_summary(results: List[AccountResult]) -> None:
+    """Prints one row per account with its status, duration and action counts."""
+    from rich.table import Table
+
+    table = Table(title="Accounts Summary")
+    for column in ("Account", "Status", "Seconds", "Fetched", "Deleted", "Moved", "Failed", "AI tokens"):
+        table.add_column(column, justify="left" if column in ("Account", "Status") else "right")
+    for result in results:
+        counters = result.counters
+        table.add_row(
+            result.name,
+            "[green]ok[/green]" if result.succeeded else "[red]error[/red]",
+            f"{result.seconds:.1f}",
+            *(
+                f"{counters.get(name, 0):g}"
+                for name in ("documents_fetched", "documents_deleted", "documents_updated", "action_failures")
+            ),
+            f"{counters.get('ai_prompt_tokens', 0) + counters.get('ai_completion_tokens', 0):g}",
+        )
+    print_table(table)
+
+
+def print_profile_report(
+    stages: List[Tuple[str, int, float, float, int, int]],
+    sleeps: Dict[str, float],
+    hot_spots: List[Tuple[str, int, float, float]],
+) -> None:
+    """Prints wall and CPU time (worker threads included) and memory per stage, time slept, and the hot spots."""
+    from rich.table import Table
+
+    stage_table = Table(title="Profiled Stages")
+    for column in ("Stage", "Runs", "Wall s", "CPU s", "Net MB", "Peak MB"):
+        stage_table.add_column(column, justify="left" if column == "Stage" else "right")
+    for stage, runs, wall, cpu, net_bytes, peak_bytes in stages:
+        stage_table.add_row(
+            stage, str(runs), f"{wall:.2f}", f"{cpu:.2f}", f"{net_bytes / 1e6:+.1f}", f"{peak_bytes / 1e6:.1f}"
+        )
+    print_table(stage_table)
+    print_neutral(
+        f"Slept {sleeps['retry_sleep']:.1f}s in retry backoff and {sleeps['rate_limit_sleep']:.1f}s "
+        "waiting for the rate limiter (summed over threads)."
+    )
+
+    hot_table = Table(title="CPU Hot Spots")
+    for column in ("Function", "Calls", "Own s", "Cumulative s"):
+        hot_table.add_column(column, justify="left" if column == "Function" else "right")
+    for function, calls, own, total in hot_spots:
+        hot_table.add_row(function, str(calls), f"{own:.3f}", f"{total:.3f}")
+    print_table(hot_table)
@@ -0,0 +1,176 @@
+import cProfile
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from metrics import snapshot
+from print_helpers import print_info, print_warning
+from print_tables import print_profile_report
+
+PROFILE_DIR = "profile"
+ALLOCATION_FRAMES = 1
+TOP_ALLOCATIONS = 25
+SLEEP_STAGES = ("retry_sleep", "rate_limit_sleep")
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+T = TypeVar("T")
+
+_ENABLED = False
+_LOCK = threading.Lock()
+_STAGES: Dict[str, Dict[str, Any]] = {}
+_SKIPPED = {"stages": 0, "tasks": 0}
+# Tracks whether this thread is inside a profiled stage; nested stages count towards the outer one
+_ACTIVE = threading.local()
+# The stage that submitted a worker task; pools run tasks in a copy of the submitting context
+_STAGE: ContextVar[Optional[str]] = ContextVar("profiled_stage", default=None)
+
+
+def start_profiling() -> None:
+    """Turns on CPU and allocation profiling for the blocks wrapped in profiled()."""
+    global _ENABLED
+    _ENABLED = True
+    tracemalloc.start(ALLOCATION_FRAMES)
+
+
+def _enable(profile: cProfile.Profile, kind: str) -> bool:
+    try:
+        profile.enable()
+        return True
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process, so concurrent stages and tasks go unprofiled
+        with _LOCK:
+            _SKIPPED[kind] += 1
+        return False
+
+
+def _start_cpu_profile() -> Optional[cProfile.Profile]:
+    # Thread CPU time leaves out sleeps and network waits, so the profile only shows work
+    profile = cProfile.Profile(time.thread_time)
+    return profile if _enable(profile, "stages") else None
+
+
+def _stage_record(stage: str) -> Dict[str, Any]:
+    return _STAGES.setdefault(
+        stage, {"runs": 0, "wall_seconds": 0.0, "net_bytes": 0, "peak_bytes": 0, "profiles": [], "sites": {}}
+    )
+
+
+def profile_task(task: Callable[..., T], *args: Any) -> T:
+    """Runs a worker pool task, adding its CPU time to the profile of the stage that submitted it."""
+    stage = _STAGE.get()
+    if not stage or getattr(_ACTIVE, "stage", None):
+        return task(*args)
+    # One profile per worker thread and stage, joining the stage's profiles once it has recorded something
+    profiles = _ACTIVE.__dict__.setdefault("worker_profiles", {})
+    profile = profiles.get(stage) or cProfile.Profile(time.thread_time)
+    if not _enable(profile, "tasks"):
+        return task(*args)
+    if stage not in profiles:
+        profiles[stage] = profile
+        with _LOCK:
+            _stage_record(stage)["profiles"].append(profile)
+    try:
+        return task(*args)
+    finally:
+        profile.disable()
+
+
+def _record(stage: str, seconds: float, profile: Optional[cProfile.Profile], before: tracemalloc.Snapshot) -> None:
+    after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    growth = after.compare_to(before, "lineno")
+    with _LOCK:
+        record = _stage_record(stage)
+        record["runs"] += 1
+        record["wall_seconds"] += seconds
+        record["net_bytes"] += sum(stat.size_diff for stat in growth)
+        record["peak_bytes"] = max(record["peak_bytes"], tracemalloc.get_traced_memory()[1])
+        if profile:
+            record["profiles"].append(profile)
+        for stat in growth[:TOP_ALLOCATIONS]:
+            site = str(stat.traceback[0])
+            record["sites"][site] = record["sites"].get(site, 0) + stat.size_diff
+
+
+@contextmanager
+def profiled(stage: str) -> Iterator[None]:
+    """With --profile, records the block's wall time, CPU profile and allocation growth under a stage."""
+    if not _ENABLED or getattr(_ACTIVE, "stage", None):
+        yield
+        return
+    _ACTIVE.stage = stage
+    stage_token = _STAGE.set(stage)
+    before = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+    tracemalloc.reset_peak()
+    profile = _start_cpu_profile()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if profile:
+            profile.disable()
+        _ACTIVE.stage = None
+        _STAGE.reset(stage_token)
+        _record(stage, seconds, profile, before)
+
+
+def _hot_spots(stats: pstats.Stats, top: int) -> List[Tuple[str, int, float, float]]:
+    """Returns the functions with the most CPU time spent in their own code."""
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][2])[:top]
+    return [
+        (f"{os.path.basename(file)}:{line}({name})", calls, own, total)
+        for (file, line, name), (_, calls, own, total, _) in rows
+    ]
+
+
+def _write_allocations(path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stage, record in sorted(_STAGES.items()):
+            f.write(f"{stage}: net {record['net_bytes'] / 1e6:+.2f} MB over {record['runs']} runs\n")
+            for site, size in sorted(record["sites"].items(), key=lambda item: -abs(item[1]))[:TOP_ALLOCATIONS]:
+                f.write(f"  {size / 1024:+12.1f} KiB  {site}\n")
+
+
+def write_profile_report(directory: str, top: int = 15) -> None:
+    """Writes a .prof file per stage and the top allocation sites, then prints the stage and hot-spot tables.
+
+    The .prof files can be opened with `python -m pstats` or tools such as snakeviz.
+    """
+    if not _ENABLED:
+        return
+    tracemalloc.stop()
+    output_dir = os.path.join(directory, PROFILE_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    combined = pstats.Stats()
+    stage_rows = []
+    for stage, record in sorted(_STAGES.items()):
+        stats = pstats.Stats(*record["profiles"]) if record["profiles"] else pstats.Stats()
+        if record["profiles"]:
+            stats.dump_stats(os.path.join(output_dir, f"{stage}.prof"))
+            combined.add(stats)
+        cpu_seconds = stats.total_tt
+        stage_rows.append(
+            (stage, record["runs"], record["wall_seconds"], cpu_seconds, record["net_bytes"], record["peak_bytes"])
+        )
+    _write_allocations(os.path.join(output_dir, "allocations.txt"))
+
+    stages = snapshot()["stages"]
+    sleeps = {name: stages.get(name, {}).get("total_seconds", 0.0) for name in SLEEP_STAGES}
+    print_profile_report(stage_rows, sleeps, _hot_spots(combined, top))
+    if _SKIPPED["stages"] or _SKIPPED["tasks"]:
+        print_warning(
+            f"No CPU profile for {_SKIPPED['stages']} stage runs and {_SKIPPED['tasks']} worker tasks: this Python "
+            "allows one active profiler at a time (3.12+), so work running concurrently with a profiled stage is "
+            "missing from the CPU columns and hot spots."
+        )
+    print_info(f"Profile written to {output_dir}")
@@ -0,0 +1,84 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from print_helpers import print_error, print_warning
+
+IdMap = Dict[int, List[str]]
+CHUNK_TOKEN_BUDGET = 8_000
+
+
+def truncate_summary(summary: str, max_chars: int) -> str:
+    """Cuts a summary to at most max_chars characters."""
+    return summary if len(summary) <= max_chars else summary[:max_chars].rstrip()
+
+
+def dedupe_summaries(docs_for_prompt: List[Dict[str, str]]) -> Tuple[List[Dict[str, Any]], IdMap]:
+    """Gives each distinct summary a short local ID, mapping it back to every Readwise ID sharing it."""
+    ids_by_summary: Dict[str, List[str]] = {}
+    for doc in docs_for_prompt:
+        ids_by_summary.setdefault(doc["summary"], []).append(doc["id"])
+    compact = [{"i": i, "s": summary} for i, summary in enumerate(ids_by_summary)]
+    id_map = {i: ids for i, ids in enumerate(ids_by_summary.values())}
+    return compact, id_map
+
+
+def encode_documents(compact_docs: List[Dict[str, Any]]) -> str:
+    """Serialises compact documents as whitespace-free JSON."""
+    return json.dumps(compact_docs, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_matching_ids(local_ids: List[int], id_map: IdMap) -> List[str]:
+    """Maps local IDs returned by the model back to Readwise IDs, ignoring unknown ones."""
+    return [doc_id for local_id in local_ids for doc_id in id_map.get(local_id, [])]
+
+
+def expand_documents(compact_docs: List[Dict[str, Any]], id_map: IdMap) -> List[Dict[str, str]]:
+    """Turns compact documents back into one {'id', 'summary'} entry per Readwise ID."""
+    return [
+        {"id": doc_id, "summary": doc["s"]}
+        for doc in compact_docs
+        for doc_id in id_map[doc["i"]]
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimates tokens using the common ~4 characters per token heuristic."""
+    return len(text) // 4 + 1
+
+
+def chunk_by_token_budget(
+    compact_docs: List[Dict[str, Any]],
+) -> List[List[Dict[str, Any]]]:
+    """Splits documents into chunks whose estimated prompt size stays within the budget."""
+    chunks: List[List[Dict[str, Any]]] = [[]]
+    used = 0
+    for doc in compact_docs:
+        cost = estimate_tokens(encode_documents([doc]))
+        if chunks[-1] and used + cost > CHUNK_TOKEN_BUDGET:
+            chunks.append([])
+            used = 0
+        chunks[-1].append(doc)
+        used += cost
+    return [chunk for chunk in chunks if chunk]
+
+
+def _handle_invalid_response() -> None:
+    print_warning("'matching_ids' is not a list of integers in OpenAI response.")
+    return None
+
+
+def parse_matching_ids(response_content: Optional[str]) -> Optional[List[int]]:
+    """Reads the local IDs from the model's JSON answer, or None if the answer is malformed."""
+    if not response_content:
+        print_warning("OpenAI response content is empty.")
+        return None
+    try:
+        ids = json.loads(response_content).get("matching_ids", [])
+        return (
+            ids
+            if isinstance(ids, list) and all(isinstance(i, int) for i in ids)
+            else _handle_invalid_response()
+        )
+    except json.JSONDecodeError:
+        print_error(f"Failed to decode JSON from OpenAI response: {response_content}")
+        return None
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Dict, NamedTuple, Tuple
+
+from metrics import record_duration
+
+
+class TokenBucket(NamedTuple):
+    """Token bucket state at one moment; the functions below return updated copies."""
+
+    rate_per_second: float
+    capacity: float
+    tokens: float
+    updated: float
+    paused_until: float = 0.0
+
+
+_LOCK = threading.Lock()
+# The current bucket of each limiter, shared by every worker that talks to the same API
+_BUCKETS: Dict[str, TokenBucket] = {}
+
+
+def full_bucket(requests_per_minute: float, now: float) -> TokenBucket:
+    """Creates a full bucket that allows short bursts up to its per-second rate."""
+    rate = requests_per_minute / 60
+    capacity = max(1.0, rate)
+    return TokenBucket(rate_per_second=rate, capacity=capacity, tokens=capacity, updated=now)
+
+
+def take_token(bucket: TokenBucket, now: float) -> Tuple[TokenBucket, float]:
+    """Takes a token if one is available; otherwise returns the refilled bucket and how long to wait."""
+    if now < bucket.paused_until:
+        return bucket, bucket.paused_until - now
+    tokens = min(bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate_per_second)
+    if tokens >= 1:
+        return bucket._replace(tokens=tokens - 1, updated=now), 0.0
+    return bucket._replace(tokens=tokens, updated=now), (1 - tokens) / bucket.rate_per_second
+
+
+def paused_bucket(bucket: TokenBucket, seconds: float, now: float) -> TokenBucket:
+    """Empties the bucket and lets no request through for the given time."""
+    return bucket._replace(tokens=0.0, paused_until=max(bucket.paused_until, now + seconds))
+
+
+def create_rate_limiter(name: str, requests_per_minute: float) -> str:
+    """Starts the named limiter with a full bucket and returns its name."""
+    with _LOCK:
+        _BUCKETS[name] = full_bucket(requests_per_minute, time.monotonic())
+    return name
+
+
+def _reserve(name: str) -> float:
+    with _LOCK:
+        _BUCKETS[name], wait = take_token(_BUCKETS[name], time.monotonic())
+    return wait
+
+
+def acquire(name: str) -> None:
+    """Blocks until the named limiter allows another request."""
+    while (wait := _reserve(name)) > 0:
+        time.sleep(wait)
+        record_duration("rate_limit_sleep", wait)
+
+
+def pause(name: str, seconds: float) -> None:
+    """Stops all workers of the named limiter for the given time, e.g. after a 429 with Retry-After."""
+    with _LOCK:
+        _BUCKETS[name] = paused_bucket(_BUCKETS[name], seconds, time.monotonic())
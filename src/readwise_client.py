@@ -1,21 +1,63 @@
-from typing import Any, Dict, List
+import sys
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
 
 import backoff
 import requests
-
-from config import load_readwise_api_token
+from requests.adapters import HTTPAdapter
+
+from config import (
+    CURRENT_ACCOUNT,
+    load_readwise_api_token,
+    load_readwise_base_url,
+    load_readwise_requests_per_minute,
+    load_http_pool_size,
+)
+from data_types import Account, Document
+from metrics import increment, record_duration, timed
+from rate_limiter import acquire, create_rate_limiter, pause
 from print_helpers import print_warning, print_error, print_info
 
-BASE_URL = "https://readwise.io/api/v3"
+BASE_URL = load_readwise_base_url()
 MAX_TRIES = 10
 MAX_DELAY = 150
 REQUEST_TIMEOUT = 30
+DEFAULT_RETRY_AFTER = 60
+DOCUMENT_FIELDS = frozenset(Document._fields)
+
+
+class ReadwiseClient(NamedTuple):
+    """Pooled keep-alive session and the name of the rate limiter for one Readwise account."""
+
+    session: requests.Session
+    rate_limiter: str
+
 
+def create_client(api_token: str, name: str = "") -> ReadwiseClient:
+    """Creates a client whose session reuses connections and carries the auth header."""
+    pool_size = load_http_pool_size()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Authorization": f"Token {api_token}"})
+    return ReadwiseClient(
+        session=session,
+        rate_limiter=create_rate_limiter(f"readwise:{name}", load_readwise_requests_per_minute()),
+    )
+
+
+@lru_cache(maxsize=None)
+def _client_for_account(account: Optional[Account]) -> ReadwiseClient:
+    # The token is resolved once per account; the account is already set in this context
+    return create_client(load_readwise_api_token(), account.name if account else "")
 
-def _get_auth_header() -> Dict[str, str]:
-    """Constructs the authorization header."""
-    api_token = load_readwise_api_token()
-    return {"Authorization": f"Token {api_token}"}
+
+def get_client() -> ReadwiseClient:
+    """Returns the shared client of the current account, or of the environment's token outside --accounts."""
+    return _client_for_account(CURRENT_ACCOUNT.get())
 
 
 def _build_fetch_params(updated_after: str, next_page_cursor: str) -> Dict[str, str]:
@@ -28,32 +70,32 @@ def _build_fetch_params(updated_after: str, next_page_cursor: str) -> Dict[str,
     return params
 
 
-def fetch_feed_documents(updated_after: str = "") -> List[Dict[str, Any]]:
-    """Fetches all documents from the Readwise Reader feed, optionally filtering by updatedAfter (ISO 8601)."""
-    headers = _get_auth_header()
-    documents = []
-    next_page_cursor = None
-    while True:
-        try:
-            response = requests.get(
-                f"{BASE_URL}/list",
-                headers=headers,
-                params=_build_fetch_params(updated_after, next_page_cursor),
-                timeout=REQUEST_TIMEOUT,
-            )
-            response.raise_for_status()
-            data = response.json()
-            documents.extend(data.get("results", []))
-            next_page_cursor = data.get("nextPageCursor")
-
-            if not next_page_cursor:
-                break
-
-        except Exception as e:
-            raise e
+def to_document(raw: Dict[str, Any], fields: FrozenSet[str] = DOCUMENT_FIELDS) -> Document:
+    """Projects a raw API result onto a compact record, blanking fields that are not needed."""
+    values = {field: str(raw.get(field) or "") if field in fields else "" for field in DOCUMENT_FIELDS}
+    # Authors repeat across many documents, so share one string per author
+    values["author"] = sys.intern(values["author"])
+    return Document(**values)
 
-    print_info(f"Fetched {len(documents)} documents from the feed.")
-    return documents
+
+def _on_retry(details: Dict[str, Any]) -> None:
+    increment("readwise_retries")
+    record_duration("retry_sleep", details["wait"])
+    print_warning(f"Request failed. Retrying in {details['wait']:.1f} seconds...")
+
+
+def _retry_after_seconds(response: requests.Response) -> float:
+    """Reads the Retry-After header as seconds, supporting both formats allowed by HTTP."""
+    value = response.headers.get("Retry-After", "")
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
 
 
 @backoff.on_exception(
@@ -61,43 +103,83 @@ def fetch_feed_documents(updated_after: str = "") -> List[Dict[str, Any]]:
     requests.exceptions.RequestException,
     max_tries=MAX_TRIES,
     max_time=MAX_DELAY,
+    giveup=lambda e: isinstance(e, requests.exceptions.HTTPError)
+    and e.response is not None
+    and e.response.status_code < 500,
     on_giveup=lambda details: print_error(
-        f"Giving up deleting document after {details['tries']} tries."
-    ),
-    on_backoff=lambda details: print_warning(
-        f"Rate limited. Retrying in {details['wait']:.1f} seconds..."
+        f"Giving up on Readwise request after {details['tries']} tries."
     ),
+    on_backoff=_on_retry,
 )
-def delete_document(document_id: str) -> bool:
-    headers = _get_auth_header()
-    response = requests.delete(
-        f"{BASE_URL}/delete/{document_id}/", headers=headers, timeout=REQUEST_TIMEOUT
-    )
+def _send(method: str, path: str, **kwargs: Any) -> requests.Response:
+    """Sends a rate-limited request, waiting out 429s for their Retry-After without blind backoff."""
+    client = get_client()
+    for _ in range(MAX_TRIES):
+        acquire(client.rate_limiter)
+        response = client.session.request(
+            method, f"{BASE_URL}{path}", timeout=REQUEST_TIMEOUT, **kwargs
+        )
+        increment("readwise_bytes_received", len(response.content))
+        if response.status_code != 429:
+            break
+        increment("readwise_429s")
+        wait = _retry_after_seconds(response)
+        print_warning(f"Rate limited. Pausing all requests for {wait:.1f} seconds...")
+        pause(client.rate_limiter, wait)
     response.raise_for_status()
+    return response
+
+
+def _fetch_page(updated_after: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """Fetches one page of the feed through the shared rate limiter, honouring Retry-After on 429s."""
+    with timed("readwise_page_fetch"):
+        return _send("GET", "/list", params=_build_fetch_params(updated_after, cursor)).json()
+
+
+def iter_feed_cursor_pages(
+    updated_after: str = "",
+    fields: FrozenSet[str] = DOCUMENT_FIELDS,
+    cursor: Optional[str] = None,
+) -> Iterator[Tuple[List[Document], Optional[str]]]:
+    """Yields each feed page with the cursor of the page after it, optionally starting from a cursor."""
+    while True:
+        data = _fetch_page(updated_after, cursor)
+        page = [to_document(raw, fields) for raw in data.get("results", [])]
+        increment("documents_fetched", len(page))
+        cursor = data.get("nextPageCursor")
+        yield page, cursor
+
+        if not cursor:
+            break
+
+
+def iter_feed_pages(
+    updated_after: str = "", fields: FrozenSet[str] = DOCUMENT_FIELDS
+) -> Iterator[List[Document]]:
+    """Yields the Readwise Reader feed one page at a time as compact records, as each page arrives."""
+    for page, _ in iter_feed_cursor_pages(updated_after, fields):
+        yield page
+
+
+def fetch_feed_documents(
+    updated_after: str = "", fields: FrozenSet[str] = DOCUMENT_FIELDS
+) -> List[Document]:
+    """Fetches all documents from the Readwise Reader feed, optionally filtering by updatedAfter (ISO 8601)."""
+    documents = [doc for page in iter_feed_pages(updated_after, fields) for doc in page]
+    print_info(f"Fetched {len(documents)} documents from the feed.")
+    return documents
+
+
+def delete_document(document_id: str) -> bool:
+    with timed("delete"):
+        _send("DELETE", f"/delete/{document_id}/")
+    increment("documents_deleted")
     return True
 
 
-@backoff.on_exception(
-    backoff.expo,
-    requests.exceptions.RequestException,
-    max_tries=MAX_TRIES,
-    max_time=MAX_DELAY,
-    on_giveup=lambda details: print_error(
-        f"Giving up updating document after {details['tries']} tries."
-    ),
-    on_backoff=lambda details: print_warning(
-        f"Rate limited. Retrying in {details['wait']:.1f} seconds..."
-    ),
-)
 def update_document(document_id: str, location: str) -> Dict[str, Any]:
     """Updates a document's location in Readwise Reader."""
-    headers = _get_auth_header()
-    payload = {"location": location}
-    response = requests.patch(
-        f"{BASE_URL}/update/{document_id}/",
-        headers=headers,
-        json=payload,
-        timeout=REQUEST_TIMEOUT,
-    )
-    response.raise_for_status()
+    with timed("update"):
+        response = _send("PATCH", f"/update/{document_id}/", json={"location": location})
+    increment("documents_updated")
     return response.json()
@@ -0,0 +1,62 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from config import load_prefilter_min_similarity
+from metrics import increment, timed
+
+NGRAM_SIZES = (3, 4, 5)
+VECTOR_BITS = 12
+BATCH_SIZE = 512
+# Odd 32-bit multipliers for a polynomial hash of up to max(NGRAM_SIZES) bytes
+HASH_MULTIPLIERS = np.array([0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F, 0x165667B1], dtype=np.uint64)
+# Multiplying by this and keeping the top bits spreads the polynomial hash over all buckets
+FIBONACCI_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _ngram_vector(text: str) -> np.ndarray:
+    """Counts hashed character n-grams of the lowercased, space-padded text, dampened by a square root."""
+    codes = np.frombuffer(f" {' '.join(text.lower().split())} ".encode("utf-8"), dtype=np.uint8)
+    codes = codes.astype(np.uint64)
+    counts = np.zeros(1 << VECTOR_BITS)
+    for size in NGRAM_SIZES:
+        if len(codes) < size:
+            continue
+        length = len(codes) - size + 1
+        hashes = sum(codes[k : k + length] * HASH_MULTIPLIERS[k] for k in range(size)) * FIBONACCI_MULTIPLIER
+        buckets = (hashes >> np.uint64(64 - VECTOR_BITS)).astype(np.int64)
+        counts += np.bincount(buckets, minlength=len(counts))
+    return np.sqrt(counts)
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def topic_similarities(summaries: List[str], topics: List[str]) -> np.ndarray:
+    """Returns each summary's highest cosine similarity to any of the topics."""
+    topic_matrix = _unit_rows(np.stack([_ngram_vector(topic) for topic in topics]))
+    best = np.zeros(len(summaries))
+    for start in range(0, len(summaries), BATCH_SIZE):
+        batch = summaries[start : start + BATCH_SIZE]
+        doc_matrix = _unit_rows(np.stack([_ngram_vector(summary) for summary in batch]))
+        best[start : start + len(batch)] = (doc_matrix @ topic_matrix.T).max(axis=1)
+    return best
+
+
+def prefilter_relevant(
+    documents: List[Dict[str, str]], topics: List[str]
+) -> Tuple[List[Dict[str, str]], int]:
+    """Keeps the documents whose summary is similar enough to an exclusion topic to be worth classifying.
+
+    Returns the relevant documents and the number skipped; skipped documents are kept in the feed.
+    """
+    floor = load_prefilter_min_similarity()
+    if not documents or not topics or floor <= 0:
+        return documents, 0
+    with timed("ai_prefilter"):
+        similarities = topic_similarities([doc["summary"] for doc in documents], topics)
+    relevant = [doc for doc, similarity in zip(documents, similarities) if similarity >= floor]
+    increment("ai_prefilter_skipped", len(documents) - len(relevant))
+    return relevant, len(documents) - len(relevant)
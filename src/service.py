@@ -0,0 +1,62 @@
+import signal
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+from config import load_poll_interval_bounds
+from date_helpers import get_watermark_updated_after
+from metrics import export_metrics, increment, timed
+from print_helpers import print_bold, print_error, print_info
+
+RunPass = Callable[[str], Optional[str]]
+
+
+def next_interval(interval: float, found_new: bool, bounds: Tuple[float, float]) -> float:
+    """Polls at the shortest interval while documents arrive and doubles the wait while the feed is idle."""
+    shortest, longest = bounds
+    return shortest if found_new else min(longest, interval * 2)
+
+
+def _install_stop_handlers(stop: threading.Event) -> None:
+    """Turns SIGTERM and SIGINT into a stop request that is honoured between passes."""
+
+    def _handle(signum: int, _frame: Any) -> None:
+        print_info(f"Received {signal.Signals(signum).name}, stopping after the current pass...")
+        stop.set()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, _handle)
+
+
+def run_service(run_pass: RunPass, updated_after: str, metrics_dir: str) -> None:
+    """Runs passes until stopped, keeping HTTP sessions, compiled filters and caches warm in between.
+
+    Each pass returns the latest updated_at it processed; the next pass resumes from there.
+    """
+    stop = threading.Event()
+    _install_stop_handlers(stop)
+    bounds = load_poll_interval_bounds()
+    interval = bounds[0]
+    latest: Optional[str] = None
+    print_bold(f"Serving: polling every {bounds[0]:g}-{bounds[1]:g} seconds. Send SIGTERM to stop.")
+
+    while not stop.is_set():
+        try:
+            with timed("poll"):
+                pass_latest = run_pass(updated_after)
+        except Exception as e:
+            # A transient failure counts as an idle poll, so the wait backs off before the retry
+            print_error(f"Poll failed: {e}")
+            increment("poll_failures")
+            pass_latest = None
+        found_new = bool(pass_latest) and (latest is None or pass_latest > latest)
+        if found_new:
+            latest = pass_latest
+            updated_after = get_watermark_updated_after(latest)
+        increment("polls")
+        export_metrics(metrics_dir)
+        interval = next_interval(interval, found_new, bounds)
+        if not stop.is_set():
+            print_info(f"Next poll in {interval:g} seconds.")
+        stop.wait(interval)
+
+    print_bold("Service stopped.")
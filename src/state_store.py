@@ -0,0 +1,56 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+from config import load_shared_state_dir, load_state_dir
+from print_helpers import print_warning
+
+STATE_FILE = "state.json"
+
+
+def _path_in(directory: str, filename: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+
+def state_path(filename: str) -> str:
+    """Returns the path of a file in the current account's state directory, creating it if needed."""
+    return _path_in(load_state_dir(), filename)
+
+
+def shared_state_path(filename: str) -> str:
+    """Returns the path of a file in the state directory shared by all accounts."""
+    return _path_in(load_shared_state_dir(), filename)
+
+
+def _read_state() -> Dict[str, Any]:
+    try:
+        with open(state_path(STATE_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print_warning(f"Ignoring unreadable state file: {e}")
+        return {}
+
+
+def _write_state(state: Dict[str, Any]) -> None:
+    """Writes the state atomically so an interrupted run never leaves a partial file."""
+    path = state_path(STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_watermark() -> Optional[str]:
+    """Loads the latest updated_at that a previous run fully processed."""
+    return _read_state().get("watermark")
+
+
+def save_watermark(updated_at: str) -> None:
+    """Records the latest processed updated_at, never moving the watermark backwards."""
+    state = _read_state()
+    if state.get("watermark") and state["watermark"] >= updated_at:
+        return
+    _write_state({**state, "watermark": updated_at})
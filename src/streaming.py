@@ -0,0 +1,92 @@
+from concurrent.futures import Future
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional
+
+from data_types import ActionPlan, DedupeIndex, Document
+from filtering import required_fields
+from action_executor import create_pool
+from cleanup import prepare_filters
+from date_helpers import latest_updated_at
+from decision_engine import plan_actions, print_plan_notes, print_plan_summary
+from journaled_actions import submit_plan
+from journal import compact_journal, record_watermark
+from readwise_client import iter_feed_pages
+from save import has_save_filters
+from print_helpers import (
+    print_bold,
+    print_error,
+    print_info,
+    print_warning,
+    print_dry_run_plan,
+)
+
+
+def _iter_pages_safely(
+    updated_after: str, totals: Dict[str, Any], fields: FrozenSet[str]
+) -> Iterator[List[Document]]:
+    """Yields feed pages, stopping with an error message if a fetch fails."""
+    try:
+        for page in iter_feed_pages(updated_after, fields):
+            totals["documents"] += len(page)
+            totals["latest"] = max(
+                filter(None, [totals["latest"], latest_updated_at(page)]), default=None
+            )
+            yield page
+        totals["complete"] = True
+    except Exception as e:
+        print_error(f"Error fetching documents: {e}")
+
+
+def _merge_plans(total: ActionPlan, page_plan: ActionPlan) -> ActionPlan:
+    """Adds up page plan counters; action lists are not kept so memory stays flat."""
+    return total._replace(
+        ai_filtered_count=total.ai_filtered_count + page_plan.ai_filtered_count,
+        ai_calls_saved=total.ai_calls_saved + page_plan.ai_calls_saved,
+        ai_tokens_saved=total.ai_tokens_saved + page_plan.ai_tokens_saved,
+        duplicate_count=total.duplicate_count + page_plan.duplicate_count,
+    )
+
+
+def run_streaming(
+    updated_after: str,
+    filters: Dict[str, List[str]],
+    dry_run: bool = False,
+    dedupe_index: Optional[DedupeIndex] = None,
+) -> Optional[str]:
+    """Plans each feed page as it arrives and queues its actions while later pages download.
+
+    Returns the latest updated_at seen if the whole feed was fetched.
+    """
+    print_bold("Starting streaming Readwise Reader cleanup and save...")
+
+    if not (prepare_filters(filters).is_valid or has_save_filters(filters) or dedupe_index):
+        print_warning("No active filters found. Exiting.")
+        return None
+
+    totals: Dict[str, Any] = {"documents": 0, "latest": None, "complete": False}
+    summary = ActionPlan([], [], 0, 0, 0, 0)
+    delete_futures: List["Future[bool]"] = []
+    save_futures: List["Future[bool]"] = []
+
+    with create_pool() as pool:
+        fields = required_fields(filters, dedupe=bool(dedupe_index))
+        for page in _iter_pages_safely(updated_after, totals, fields):
+            plan = plan_actions(page, filters, dedupe_index)
+            summary = _merge_plans(summary, plan)
+            if dry_run:
+                print_dry_run_plan(page, plan)
+                continue
+            page_deletes, page_saves = submit_plan(pool, plan)
+            delete_futures += page_deletes
+            save_futures += page_saves
+
+        print_info(f"Streamed {totals['documents']} documents from the feed.")
+        print_plan_notes(summary)
+        if not dry_run:
+            if totals["complete"]:
+                record_watermark(totals["latest"])
+            print_plan_summary(filters, summary, (delete_futures, save_futures))
+
+    if not dry_run:
+        compact_journal()
+
+    return totals["latest"] if totals["complete"] else None
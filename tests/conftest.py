@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    """Gives every test its own state directory and tokens, so nothing touches the real .state."""
+    monkeypatch.setenv("STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("READWISE_API_TOKEN", "env-token")
+    monkeypatch.setenv("GIST_ID", "env-gist")
+    return tmp_path
@@ -0,0 +1,49 @@
+import time
+
+import ai_cache
+from ai_cache import lookup_verdicts, store_verdicts
+from metrics import snapshot
+
+TOPICS = ["crypto"]
+
+
+def _docs(*summaries):
+    return [{"id": f"doc-{i}", "summary": summary} for i, summary in enumerate(summaries)]
+
+
+def _counter(name):
+    return snapshot()["counters"].get(name, 0)
+
+
+def test_stored_verdicts_are_hits_and_count_in_the_metrics():
+    documents = _docs("bitcoin rallies", "a sourdough recipe")
+    store_verdicts(documents, {"doc-0"}, TOPICS)
+    hits, misses = _counter("ai_cache_hits"), _counter("ai_cache_misses")
+
+    unseen = {"id": "doc-2", "summary": "a new summary"}
+    assert lookup_verdicts(documents + [unseen], TOPICS) == {"doc-0": True, "doc-1": False}
+    assert (_counter("ai_cache_hits") - hits, _counter("ai_cache_misses") - misses) == (2, 1)
+
+
+def test_verdicts_miss_after_the_topic_list_changes():
+    documents = _docs("bitcoin rallies")
+    store_verdicts(documents, {"doc-0"}, TOPICS)
+    assert lookup_verdicts(documents, TOPICS + ["football"]) == {}
+
+
+def test_verdicts_expire_after_the_ttl(monkeypatch):
+    documents = _docs("bitcoin rallies")
+    store_verdicts(documents, {"doc-0"}, TOPICS)
+    later = time.time() + (ai_cache.CACHE_TTL_DAYS + 1) * 86400
+    monkeypatch.setattr(ai_cache.time, "time", lambda: later)
+    assert lookup_verdicts(documents, TOPICS) == {}
+
+
+def test_oldest_verdicts_are_evicted_past_the_size_limit(monkeypatch):
+    monkeypatch.setattr(ai_cache, "CACHE_MAX_ENTRIES", 2)
+    clock = iter(range(1_000_000_000, 1_000_000_010))
+    monkeypatch.setattr(ai_cache.time, "time", lambda: next(clock))
+    documents = _docs("first", "second", "third")
+    for doc in documents:
+        store_verdicts([doc], set(), TOPICS)
+    assert sorted(lookup_verdicts(documents, TOPICS)) == ["doc-1", "doc-2"]
@@ -0,0 +1,31 @@
+import backfill
+import journaled_actions
+from data_types import Document
+from dedupe import create_index
+
+STORY = "The city council approved a new budget for public transport, adding night buses and cheaper passes."
+
+
+def _doc(doc_id):
+    return Document(id=doc_id, title="Budget", source_url="", author="", summary=STORY, updated_at="2024-01-02")
+
+
+def test_a_resumed_backfill_still_deletes_copies_of_earlier_batches(monkeypatch):
+    monkeypatch.setenv("BACKFILL_BATCH_SIZE", "1")
+    deleted = []
+    monkeypatch.setattr(journaled_actions, "delete_document", lambda doc_id: deleted.append(doc_id) or True)
+
+    def interrupted_feed(updated_after, fields, cursor):
+        if cursor is None:
+            yield [_doc("original")], "page-2"
+            raise ConnectionError("killed")
+        yield [_doc("copy")], None
+
+    monkeypatch.setattr(backfill, "iter_feed_cursor_pages", interrupted_feed)
+    assert backfill.run_backfill("2024-01-01", {}, dedupe_index=create_index()) is None
+    assert backfill.load_checkpoint()["cursor"] == "page-2"
+
+    # The next run starts with a fresh in-memory index, as a new process would
+    assert backfill.run_backfill("2024-01-01", {}, dedupe_index=create_index()) == "2024-01-02"
+    assert deleted == ["copy"]
+    assert backfill.load_checkpoint() is None
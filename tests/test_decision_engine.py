@@ -0,0 +1,39 @@
+import cleanup
+from data_types import Document
+from decision_engine import plan_actions
+
+FILTERS = {
+    "title_exclude": ["sponsored"],
+    "author_save_later": ["Favourite"],
+    "author_save_inbox": ["Favourite", "=Newsletter Team"],
+    "ai_topic_exclude": ["crypto"],
+}
+
+
+def _doc(doc_id, title="Story", author="", summary="A summary about something"):
+    return Document(id=doc_id, title=title, source_url="", author=author, summary=summary, updated_at="")
+
+
+def test_each_document_gets_one_action_and_only_undecided_ones_reach_the_ai(monkeypatch):
+    sent_to_ai = []
+
+    def filter_by_topic(documents, topics):
+        sent_to_ai.extend(doc.id for doc in documents)
+        return [doc.id for doc in documents if "crypto" in doc.summary]
+
+    monkeypatch.setattr(cleanup, "filter_by_topic", filter_by_topic)
+    documents = [
+        _doc("deleted", title="A sponsored post", author="Favourite Writer", summary="crypto news"),
+        _doc("later", author="Favourite Writer", summary="crypto news"),
+        _doc("inbox", author="Newsletter Team"),
+        _doc("ai-deleted", summary="crypto news"),
+        _doc("kept"),
+    ]
+    plan = plan_actions(documents, FILTERS)
+
+    assert sent_to_ai == ["ai-deleted", "kept"]
+    assert plan.delete_ids == ["deleted", "ai-deleted"]
+    assert [(action.doc_id, action.location) for action in plan.save_actions] == [("later", "later"), ("inbox", "new")]
+    assert plan.ai_filtered_count == 1
+    acted_on = plan.delete_ids + [action.doc_id for action in plan.save_actions]
+    assert len(acted_on) == len(set(acted_on))
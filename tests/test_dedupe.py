@@ -0,0 +1,46 @@
+from data_types import Document
+from decision_engine import plan_actions
+from dedupe import canonical_url, create_index, find_duplicates, simhash
+
+STORY = (
+    "The city council approved a new budget for public transport on Tuesday, "
+    "adding night buses and cheaper monthly passes for students and pensioners."
+)
+
+
+def _doc(doc_id, summary=STORY, author="", source_url=""):
+    return Document(id=doc_id, title="Transport budget", source_url=source_url, author=author, summary=summary,
+                    updated_at="2024-01-01T00:00:00+00:00")
+
+
+def test_near_identical_texts_get_close_fingerprints():
+    original = simhash(STORY)
+    edited = simhash(STORY.replace("Tuesday", "Wednesday"))
+    unrelated = simhash("A recipe for sourdough bread with a long cold fermentation and a very hot oven.")
+    assert bin(original ^ edited).count("1") <= 12
+    assert bin(original ^ unrelated).count("1") > 12
+    assert simhash("too short") is None
+
+
+def test_canonical_url_ignores_scheme_www_and_tracking():
+    tracked = "https://www.example.com/a/?utm_source=x&id=1#top"
+    assert canonical_url(tracked) == canonical_url("http://example.com/a?id=1")
+
+
+def test_find_duplicates_keeps_the_first_copy():
+    assert find_duplicates(create_index(), [_doc("1"), _doc("2"), _doc("3", summary=STORY.upper())]) == ["2", "3"]
+
+
+def test_a_duplicate_with_a_save_location_is_kept_and_the_other_copy_deleted():
+    documents = [_doc("feed-copy"), _doc("saved-copy", author="Favourite Writer")]
+    plan = plan_actions(documents, {"author_save_later": ["Favourite Writer"]}, create_index())
+
+    assert plan.delete_ids == ["feed-copy"]
+    assert [(action.doc_id, action.location) for action in plan.save_actions] == [("saved-copy", "later")]
+
+
+def test_two_saved_duplicates_are_both_kept():
+    documents = [_doc("1", author="Favourite Writer"), _doc("2", author="Favourite Writer")]
+    plan = plan_actions(documents, {"author_save_inbox": ["Favourite Writer"]}, create_index())
+    assert plan.delete_ids == []
+    assert len(plan.save_actions) == 2
@@ -0,0 +1,49 @@
+import filtering
+from data_types import Document
+from filtering import compile_filters, matches_exclude
+
+
+def _doc(doc_id, title="", source_url="", author=""):
+    return Document(id=doc_id, title=title, source_url=source_url, author=author, summary="", updated_at="")
+
+
+def test_compile_filters_reuses_matchers_for_identical_filters():
+    filters = {"title_exclude": ["sponsored"]}
+    assert compile_filters(filters) is compile_filters(dict(filters))
+
+
+def test_compiled_memo_stays_bounded():
+    for i in range(filtering.MAX_COMPILED * 3):
+        compile_filters({"title_exclude": [f"word{i}"]})
+    assert len(filtering._COMPILED) <= filtering.MAX_COMPILED
+
+
+def test_matches_exclude_checks_title_domain_and_exact_author():
+    filters = {
+        "title_exclude": ["sponsored"],
+        "domain_exclude": ["example.com"],
+        "author_exclude": ["=Jane Doe"],
+    }
+    documents = [
+        _doc("1", title="A sponsored post"),
+        _doc("2", source_url="https://news.example.com/a"),
+        _doc("3", author="Jane Doe"),
+        _doc("4", author="Jane Doe Jr"),
+        _doc("5", title="Something else", source_url="https://other.org"),
+    ]
+    matchers = compile_filters(filters)
+    assert [doc.id for doc in documents if matches_exclude(doc, matchers)] == ["1", "2", "3"]
+
+
+def test_domain_rules_match_the_domain_and_its_subdomains_only():
+    matchers = compile_filters({"domain_exclude": ["bad.com"]})
+    urls = {
+        "https://bad.com/a": True,
+        "https://www.bad.com/a": True,
+        "http://news.BAD.com:8080/a?x=1": True,
+        "https://notbad.com/a": False,
+        "https://bad.com.example.org/a": False,
+        "https://example.org/?ref=bad.com": False,
+        "": False,
+    }
+    assert {url: matches_exclude(_doc("1", source_url=url), matchers) for url in urls} == urls
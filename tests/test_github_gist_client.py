@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import github_gist_client
+from github_gist_client import _cache_file, _fetch_gist_content
+
+
+class _Response:
+    def __init__(self, status_code, content="", etag=None):
+        self.status_code = status_code
+        self.headers = {"ETag": etag} if etag else {}
+        self._content = content
+
+    def json(self):
+        return {"files": {"filters.json": {"content": self._content}}}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+@pytest.fixture
+def requests_get(monkeypatch):
+    calls = []
+
+    def fake_get(url, headers, timeout):
+        calls.append(headers)
+        return _Response(200, '{"title_exclude": ["x"]}', etag='"v2"')
+
+    monkeypatch.setattr(github_gist_client.requests, "get", fake_get)
+    return calls
+
+
+@pytest.mark.parametrize("cached", [{"content": "{}"}, {"etag": '"v1"'}, ["not", "a", "dict"]])
+def test_malformed_cache_falls_back_to_a_plain_fetch(requests_get, cached):
+    with open(_cache_file("gist"), "w", encoding="utf-8") as f:
+        json.dump(cached, f)
+    assert _fetch_gist_content("gist") == '{"title_exclude": ["x"]}'
+    assert "If-None-Match" not in requests_get[0]
+
+
+def test_failed_cache_write_does_not_fail_the_fetch(requests_get, monkeypatch):
+    monkeypatch.setattr(github_gist_client, "_cache_file", lambda gist_id: "/nonexistent/dir/gist.json")
+    assert _fetch_gist_content("gist") == '{"title_exclude": ["x"]}'
+
+
+def test_different_gists_are_fetched_in_parallel(monkeypatch):
+    import threading
+
+    started = {name: threading.Event() for name in ("a", "b")}
+
+    def slow_fetch(gist_id):
+        started[gist_id].set()
+        # Gist "a" only finishes once "b" has started, which deadlocks if fetches are serialised
+        assert started["b" if gist_id == "a" else "a"].wait(timeout=5)
+        return gist_id
+
+    monkeypatch.setattr(github_gist_client, "_fetch_gist_content", slow_fetch)
+    results = {}
+    threads = [
+        threading.Thread(target=lambda name=name: results.update({name: github_gist_client._gist_content(name)}))
+        for name in ("a", "b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"a": "a", "b": "b"}
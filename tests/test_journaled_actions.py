@@ -0,0 +1,65 @@
+import pytest
+import requests
+
+import journaled_actions
+from action_executor import count_results, create_pool
+from data_types import ActionPlan, SaveAction
+from journal import load_pending
+
+
+def _plan(delete_ids, save_actions=()):
+    return ActionPlan(list(delete_ids), list(save_actions), 0, 0, 0, 0)
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+@pytest.fixture
+def readwise(monkeypatch):
+    """Fakes the Readwise actions; documents listed in `failures` raise the given error."""
+    failures = {}
+
+    def act(doc_id, *args):
+        if doc_id in failures:
+            raise failures[doc_id]
+        return True
+
+    monkeypatch.setattr(journaled_actions, "delete_document", act)
+    monkeypatch.setattr(journaled_actions, "update_document", act)
+    return failures
+
+
+def _submit(plan):
+    with create_pool() as pool:
+        delete_futures, save_futures = journaled_actions.submit_plan(pool, plan)
+        return count_results(delete_futures), count_results(save_futures)
+
+
+def test_failed_actions_stay_pending_in_the_journal(readwise):
+    readwise.update({"d2": _http_error(500), "s2": requests.ConnectionError("reset")})
+    plan = _plan(["d1", "d2"], [SaveAction("s1", "later"), SaveAction("s2", "new")])
+
+    assert _submit(plan) == ((1, 1), (1, 1))
+    pending, _ = load_pending()
+    assert pending.delete_ids == ["d2"]
+    assert pending.save_actions == [SaveAction("s2", "new")]
+
+
+def test_documents_that_no_longer_exist_are_not_retried(readwise):
+    readwise["d1"] = _http_error(404)
+    assert _submit(_plan(["d1"])) == ((0, 1), (0, 0))
+    pending, _ = load_pending()
+    assert pending.delete_ids == []
+
+
+def test_resume_retries_failed_actions(readwise):
+    readwise["d1"] = _http_error(503)
+    _submit(_plan(["d1"]))
+    readwise.clear()
+
+    journaled_actions.resume_pending_actions()
+    pending, _ = load_pending()
+    assert pending.delete_ids == []
@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import local_model
+from ai_cache import lookup_verdicts
+
+TOPICS = ["articles about football"]
+FOOTBALL = "The striker scored twice as the football club won the derby in front of a full stadium"
+COOKING = "Slow roast the vegetables with garlic and olive oil, then blend them into a smooth soup"
+
+
+@pytest.fixture(autouse=True)
+def fresh_models(monkeypatch):
+    monkeypatch.setattr(local_model, "_MODELS", {})
+    monkeypatch.setenv("LOCAL_MODEL_MIN_EXAMPLES", "20")
+
+
+def _docs(prefix, summary, count):
+    return [{"id": f"{prefix}{i}", "summary": f"{summary} {i}"} for i in range(count)]
+
+
+@pytest.mark.parametrize("content", [b"", b"PK\x03\x04truncated", b"not a zip at all"])
+def test_corrupt_model_file_starts_a_fresh_model(content):
+    with open(local_model._model_path(TOPICS), "wb") as f:
+        f.write(content)
+    model = local_model.get_model(TOPICS)
+    assert model.examples == 0
+    assert not model.weights.any()
+
+
+def test_trained_model_decides_confident_cases_without_caching_them():
+    football, cooking = _docs("f", FOOTBALL, 20), _docs("c", COOKING, 20)
+    assert local_model.classify_confident(football, TOPICS) == ([], football)
+
+    for _ in range(5):
+        local_model.learn_verdicts(football + cooking, {doc["id"] for doc in football}, TOPICS)
+    local_model.save_model(TOPICS)
+    local_model._MODELS.clear()
+
+    new = [{"id": "f-new", "summary": FOOTBALL}, {"id": "c-new", "summary": COOKING}]
+    excluded, uncertain = local_model.classify_confident(new, TOPICS)
+    assert (excluded, uncertain) == (["f-new"], [])
+    assert lookup_verdicts(new, TOPICS) == {}
+
+
+def test_training_returns_a_new_model_and_leaves_the_old_one_unchanged():
+    model = local_model.get_model(TOPICS)
+    examples = [(*local_model._features(FOOTBALL), 1.0), (*local_model._features(COOKING), 0.0)]
+    updated = local_model.trained(model, examples)
+
+    assert not model.weights.any() and model.examples == 0
+    assert updated.weights.any() and (updated.examples, updated.positives) == (2, 1)
+
+
+def test_a_failed_save_warns_and_leaves_no_temporary_file(monkeypatch, state_dir):
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(local_model.np, "savez_compressed", disk_full)
+    local_model.save_model(TOPICS)
+    assert not list(state_dir.rglob("*.tmp"))
+    assert not os.path.exists(local_model._model_path(TOPICS))
+
+
+def test_concurrent_saves_leave_a_readable_model(state_dir):
+    local_model.learn_verdicts(_docs("f", FOOTBALL, 5), {"f0"}, TOPICS)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: local_model.save_model(TOPICS), range(8)))
+    local_model._MODELS.clear()
+    assert local_model.get_model(TOPICS).examples == 5
+    assert not list(state_dir.rglob("*.tmp"))
@@ -0,0 +1,60 @@
+import argparse
+
+import pytest
+
+import main
+from config import CURRENT_ACCOUNT
+from data_types import Account, Document
+from state_store import load_watermark, save_watermark
+
+
+def _args(**overrides):
+    values = {"dry_run": True, "updated_after": "2024-01-01T00:00:00", "backfill": False, "serve": True}
+    return argparse.Namespace(**{**values, **overrides})
+
+
+def test_account_pass_continues_from_its_own_latest_after_the_first_pass(monkeypatch):
+    windows = []
+
+    def run_pass(args, updated_after):
+        windows.append(updated_after)
+        return "2024-03-01T12:00:00+00:00"
+
+    monkeypatch.setattr(main, "resume_pending_actions", lambda dry_run: None)
+    monkeypatch.setattr(main, "_run_pass", run_pass)
+    latest_by_account = {}
+    token = CURRENT_ACCOUNT.set(Account("work", "token", "gist", None))
+    try:
+        main._account_pass(_args(), latest_by_account)
+        main._account_pass(_args(), latest_by_account)
+    finally:
+        CURRENT_ACCOUNT.reset(token)
+
+    assert windows[0].startswith("2024-01-01")
+    assert windows[1].startswith("2024-03-01")
+    assert latest_by_account == {"work": "2024-03-01T12:00:00+00:00"}
+
+
+def test_next_run_starts_at_the_watermark_minus_the_overlap():
+    save_watermark("2024-03-01T12:00:00+00:00")
+    assert main._parse_updated_after(None) == "2024-03-01T11:50:00+00:00"
+
+
+def test_explicit_updated_after_overrides_the_watermark():
+    save_watermark("2024-03-01T12:00:00+00:00")
+    assert main._parse_updated_after("2024-01-01T00:00:00+00:00").startswith("2024-01-01T00:00:00")
+
+
+@pytest.mark.parametrize(
+    "dry_run, expected", [(True, "2024-03-01T12:00:00+00:00"), (False, "2024-03-02T08:00:00+00:00")]
+)
+def test_only_real_runs_advance_the_watermark(monkeypatch, dry_run, expected):
+    save_watermark("2024-03-01T12:00:00+00:00")
+    document = Document("1", "Title", "", "", "", "2024-03-02T08:00:00+00:00")
+    monkeypatch.setattr(main, "_get_filters", lambda: {"title_exclude": ["sponsored"]})
+    monkeypatch.setattr(main, "_get_documents", lambda updated_after, fields: [document])
+    monkeypatch.setattr(main, "run_plan", lambda *args: None)
+    args = _args(dry_run=dry_run, serve=False, stream=False, dedupe=False, dedupe_history=False)
+
+    assert main._run_pass(args, main._parse_updated_after(None)) == document.updated_at
+    assert load_watermark() == expected
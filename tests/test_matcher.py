@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from matcher import compile_author_rule, compile_patterns, matches, matches_author
+
+TERM_SETS = [
+    [],
+    ["he", "she", "his", "hers"],
+    ["spons", "sponsored", "Sponsor"],
+    ["abcd", "bc", "bcde", "c"],
+    ["aab", "ab", "b"],
+    ["Crypto", "NFT", "web3"],
+    [""],
+]
+TEXTS = ["", "ushers", "A Sponsored Post", "abcde", "aaab", "xyz", "WEB3 and nft", "sponsor", "bcd", "ab"]
+
+
+def _reference(text, terms):
+    """The substring check the matcher replaced."""
+    return bool(terms) and any(term.lower() in text.lower() for term in terms)
+
+
+@pytest.mark.parametrize("terms", TERM_SETS)
+def test_matcher_agrees_with_the_substring_check(terms):
+    matcher = compile_patterns(terms)
+    assert [matches(matcher, text) for text in TEXTS] == [_reference(text, terms) for text in TEXTS]
+
+
+def test_matcher_agrees_with_the_substring_check_on_random_terms():
+    rng = random.Random(7)
+    for _ in range(200):
+        terms = ["".join(rng.choices("abAB", k=rng.randint(1, 4))) for _ in range(rng.randint(1, 5))]
+        text = "".join(rng.choices("abAB ", k=rng.randint(0, 12)))
+        assert matches(compile_patterns(terms), text) == _reference(text, terms), (terms, text)
+
+
+def test_author_rule_matches_exact_names_whole_and_other_patterns_as_substrings():
+    rule = compile_author_rule(["=Jane Doe", "smith", "= "])
+    assert matches_author(rule, "  jane doe ")
+    assert not matches_author(rule, "Jane Doe Jr")
+    assert matches_author(rule, "Anna Smithson")
+    assert not matches_author(rule, "")
+    assert not matches_author(compile_author_rule([]), "Jane Doe")
@@ -0,0 +1,41 @@
+import json
+import re
+
+from metrics import export_metrics, increment, record_duration, timed
+
+SAMPLE = re.compile(r'^(?P<name>[a-z0-9_]+)(?:\{stage="(?P<stage>[a-z0-9_]+)"\})? (?P<value>[0-9.e+-]+)$')
+
+
+def _parse_prometheus(text):
+    """Returns {(name, stage): value} and {name: type}, failing on any line that isn't valid textfile syntax."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            types[name] = metric_type
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        assert match["name"] in types, f"{match['name']} has no TYPE line"
+        samples[(match["name"], match["stage"])] = float(match["value"])
+    return samples, types
+
+
+def test_export_writes_parseable_json_and_prometheus_textfiles(tmp_path):
+    with timed("test_export_stage"):
+        pass
+    record_duration("test_export_stage", 2.5)
+    increment("test_export_counter", 3)
+
+    export_metrics(str(tmp_path))
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    samples, types = _parse_prometheus((tmp_path / "metrics.prom").read_text())
+
+    assert data["stages"]["test_export_stage"]["count"] == 2
+    assert data["stages"]["test_export_stage"]["max_seconds"] == 2.5
+    assert data["counters"]["test_export_counter"] == 3
+    assert samples[("readwise_cleaner_stage_runs_total", "test_export_stage")] == 2
+    assert samples[("readwise_cleaner_stage_max_seconds", "test_export_stage")] == 2.5
+    assert samples[("readwise_cleaner_test_export_counter_total", None)] == 3
+    assert types["readwise_cleaner_test_export_counter_total"] == "counter"
+    assert samples[("readwise_cleaner_last_run_timestamp_seconds", None)] == round(data["timestamp"])
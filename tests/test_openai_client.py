@@ -0,0 +1,94 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import openai_client
+import prompt_encoding
+from prompt_encoding import chunk_by_token_budget, encode_documents, estimate_tokens
+
+ENCODED_DOC = re.compile(r'\{"i":(\d+),"s":"([^"]*)"\}')
+
+
+class FakeOpenAI:
+    """Answers like the model, excluding crypto summaries; prompts containing `fail_on` raise."""
+
+    calls = []
+    fail_on = ""
+    failures_left = 0
+
+    def __init__(self, api_key=None):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        FakeOpenAI.calls.append(prompt)
+        if FakeOpenAI.fail_on in prompt and FakeOpenAI.failures_left:
+            FakeOpenAI.failures_left -= 1
+            raise ConnectionError("reset by peer")
+        ids = [int(i) for i, summary in ENCODED_DOC.findall(prompt) if "crypto" in summary]
+        message = SimpleNamespace(content=json.dumps({"matching_ids": ids}))
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    monkeypatch.setattr("openai.OpenAI", FakeOpenAI)
+    monkeypatch.setattr("backoff._sync.time.sleep", lambda seconds: None)
+    monkeypatch.setattr(prompt_encoding, "CHUNK_TOKEN_BUDGET", 40)
+    monkeypatch.setattr(FakeOpenAI, "calls", [])
+    return FakeOpenAI
+
+
+def _docs():
+    summaries = ["crypto markets fall", "a sourdough recipe", "crypto wallets hacked", "football results"]
+    return [{"id": f"doc-{i}", "summary": f"{summary} number {i}"} for i, summary in enumerate(summaries * 3)]
+
+
+def test_chunks_stay_within_the_token_budget(monkeypatch):
+    monkeypatch.setattr(prompt_encoding, "CHUNK_TOKEN_BUDGET", 40)
+    compact, _ = prompt_encoding.dedupe_summaries(_docs())
+    chunks = chunk_by_token_budget(compact)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(encode_documents(chunk)) <= prompt_encoding.CHUNK_TOKEN_BUDGET for chunk in chunks)
+    assert [doc for chunk in chunks for doc in chunk] == compact
+
+
+def test_a_failed_chunk_is_retried(fake_openai, monkeypatch):
+    monkeypatch.setattr(fake_openai, "fail_on", "number 4")
+    monkeypatch.setattr(fake_openai, "failures_left", 1)
+    matching = openai_client._request_matching_ids(_docs(), ["crypto"])
+    assert sorted(matching) == sorted(doc["id"] for doc in _docs() if "crypto" in doc["summary"])
+
+
+def test_a_chunk_that_keeps_failing_does_not_drop_the_other_chunks(fake_openai, monkeypatch):
+    monkeypatch.setattr(fake_openai, "fail_on", "number 4")
+    monkeypatch.setattr(fake_openai, "failures_left", openai_client.MAX_CHUNK_TRIES)
+    matching = openai_client._request_matching_ids(_docs(), ["crypto"])
+
+    failed_chunk = next(prompt for prompt in fake_openai.calls if "number 4" in prompt)
+    expected = [doc["id"] for doc in _docs() if "crypto" in doc["summary"] and doc["summary"] not in failed_chunk]
+    assert sorted(matching) == sorted(expected)
+    assert expected
+
+
+def test_fully_cached_documents_do_not_load_numpy(state_dir):
+    script = """
+import sys
+from ai_cache import store_verdicts
+from data_types import Document
+from openai_client import filter_by_topic
+
+documents = [Document("1", "", "", "", "crypto markets fall", ""), Document("2", "", "", "", "a recipe", "")]
+store_verdicts([{"id": doc.id, "summary": doc.summary} for doc in documents], {"1"}, ["crypto"])
+assert filter_by_topic(documents, ["crypto"]) == ["1"]
+assert "numpy" not in sys.modules, "numpy was imported"
+"""
+    src_dir = os.path.join(os.path.dirname(__file__), "..", "src")
+    env = {**os.environ, "PYTHONPATH": src_dir, "STATE_DIR": str(state_dir)}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
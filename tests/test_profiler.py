@@ -0,0 +1,53 @@
+import os
+import pstats
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import pytest
+
+import profiler
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    monkeypatch.setattr(profiler, "_STAGES", {})
+    monkeypatch.setattr(profiler, "_SKIPPED", {"stages": 0, "tasks": 0})
+    monkeypatch.setattr(profiler, "_ENABLED", False)
+    profiler.start_profiling()
+    yield
+    tracemalloc.stop()
+
+
+def _busy_worker(n):
+    return sum(i * i for i in range(n))
+
+
+def test_worker_tasks_are_profiled_under_the_submitting_stage(profiling, tmp_path):
+    with profiler.profiled("plan_and_act"):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(copy_context().run, profiler.profile_task, _busy_worker, 20000) for _ in range(4)]
+            assert [f.result() for f in futures] == [_busy_worker(20000)] * 4
+    profiler.write_profile_report(str(tmp_path))
+
+    stats = pstats.Stats(str(tmp_path / "profile" / "plan_and_act.prof"))
+    assert any(name == "_busy_worker" for _, _, name in stats.stats)
+
+
+def test_tasks_outside_a_stage_are_not_profiled(profiling):
+    assert profiler.profile_task(_busy_worker, 10) == _busy_worker(10)
+    assert profiler._STAGES == {}
+
+
+def test_skipped_profiles_are_reported(profiling, tmp_path, monkeypatch, capsys):
+    def _refuse(profile, kind):
+        profiler._SKIPPED[kind] += 1
+        return False
+
+    monkeypatch.setattr(profiler, "_enable", _refuse)
+    with profiler.profiled("fetch"), ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(copy_context().run, profiler.profile_task, _busy_worker, 10).result()
+    profiler.write_profile_report(str(tmp_path))
+
+    assert "1 stage runs and 1 worker tasks" in " ".join(capsys.readouterr().out.split())
+    assert os.path.exists(tmp_path / "profile" / "allocations.txt")
@@ -0,0 +1,45 @@
+import json
+
+from prompt_encoding import (
+    chunk_by_token_budget,
+    decode_matching_ids,
+    dedupe_summaries,
+    encode_documents,
+    expand_documents,
+    parse_matching_ids,
+)
+
+DOCUMENTS = [
+    {"id": "rw-a", "summary": "Bitcoin hits a new high"},
+    {"id": "rw-b", "summary": "Ten tips for better sleep"},
+    {"id": "rw-c", "summary": "Bitcoin hits a new high"},
+    {"id": "rw-d", "summary": "Räksmörgås och kaffe"},
+    {"id": "rw-e", "summary": "Bitcoin hits a new high"},
+]
+
+
+def test_identical_summaries_are_sent_once_and_decoded_for_every_copy():
+    compact, id_map = dedupe_summaries(DOCUMENTS)
+    prompt = encode_documents(compact)
+    assert prompt.count("Bitcoin") == 1
+    assert "Räksmörgås" in prompt
+
+    # The model answers with the local ids of the documents it excludes
+    bitcoin = [doc["i"] for doc in json.loads(prompt) if "Bitcoin" in doc["s"]]
+    response = json.dumps({"matching_ids": bitcoin + [99]})
+
+    assert decode_matching_ids(parse_matching_ids(response), id_map) == ["rw-a", "rw-c", "rw-e"]
+
+
+def test_round_trip_through_chunks_keeps_every_document_once():
+    compact, id_map = dedupe_summaries(DOCUMENTS)
+    expanded = [doc for chunk in chunk_by_token_budget(compact) for doc in expand_documents(chunk, id_map)]
+    assert sorted((doc["id"], doc["summary"]) for doc in expanded) == sorted(
+        (doc["id"], doc["summary"]) for doc in DOCUMENTS
+    )
+
+
+def test_malformed_answers_decode_to_nothing():
+    assert parse_matching_ids('{"matching_ids": ["1"]}') is None
+    assert parse_matching_ids("not json") is None
+    assert parse_matching_ids("") is None
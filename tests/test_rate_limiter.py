@@ -0,0 +1,28 @@
+from rate_limiter import full_bucket, paused_bucket, take_token
+
+
+def test_a_full_bucket_allows_a_burst_then_spaces_requests_out():
+    bucket = full_bucket(120, now=0.0)
+    bucket, first = take_token(bucket, now=0.0)
+    bucket, second = take_token(bucket, now=0.0)
+    bucket, third = take_token(bucket, now=0.0)
+    assert (first, second) == (0.0, 0.0)
+    assert third == 0.5
+
+    _, after_refill = take_token(bucket, now=0.5)
+    assert after_refill == 0.0
+
+
+def test_a_pause_blocks_until_it_ends_and_empties_the_bucket():
+    bucket = paused_bucket(full_bucket(60, now=0.0), seconds=7, now=0.0)
+    _, wait = take_token(bucket, now=2.0)
+    assert wait == 5.0
+
+    _, after_pause = take_token(bucket, now=8.0)
+    assert after_pause == 0.0
+
+
+def test_taking_a_token_leaves_the_original_bucket_unchanged():
+    bucket = full_bucket(60, now=0.0)
+    take_token(bucket, now=0.0)
+    assert bucket.tokens == 1.0
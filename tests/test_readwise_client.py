@@ -0,0 +1,73 @@
+from config import CURRENT_ACCOUNT
+from data_types import Account
+from filtering import required_fields
+from readwise_client import get_client, to_document
+
+
+def test_get_client_reuses_one_client_per_account(monkeypatch):
+    first = get_client()
+    monkeypatch.setenv("READWISE_API_TOKEN", "changed")
+    assert get_client() is first
+
+    token = CURRENT_ACCOUNT.set(Account("work", "work-token", "gist", None))
+    try:
+        account_client = get_client()
+    finally:
+        CURRENT_ACCOUNT.reset(token)
+    assert account_client is not first
+    assert account_client.session.headers["Authorization"] == "Token work-token"
+
+
+def test_page_fetch_waits_out_429s_through_the_shared_limiter(monkeypatch):
+    import requests
+
+    import readwise_client
+
+    responses = []
+    for status, headers, body in [(429, {"Retry-After": "7"}, b"{}"), (200, {}, b'{"results": []}')]:
+        response = requests.Response()
+        response.status_code, response.headers, response._content = status, headers, body
+        responses.append(response)
+    pauses = []
+    monkeypatch.setattr(get_client().session, "request", lambda *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(readwise_client, "acquire", lambda limiter: None)
+    monkeypatch.setattr(readwise_client, "pause", lambda limiter, seconds: pauses.append(seconds))
+
+    assert readwise_client._fetch_page("", None) == {"results": []}
+    assert pauses == [7.0]
+
+
+RAW_RESULT = {
+    "id": "01abc",
+    "title": "A title",
+    "source_url": "https://news.example.com/a",
+    "author": "Jane Doe",
+    "summary": "A summary",
+    "updated_at": "2024-03-01T12:00:00+00:00",
+    "html": "<p>large body the cleaner never reads</p>",
+    "word_count": 1200,
+    "tags": None,
+}
+
+
+def test_to_document_keeps_every_field_later_stages_read():
+    document = to_document(RAW_RESULT)
+    assert document._asdict() == {field: RAW_RESULT[field] for field in document._fields}
+
+
+def test_projection_keeps_the_fields_the_active_filters_need():
+    filters = {"domain_exclude": ["example.com"], "author_exclude": ["=Jane Doe"]}
+    document = to_document(RAW_RESULT, required_fields(filters))
+    assert (document.id, document.source_url, document.author) == ("01abc", RAW_RESULT["source_url"], "Jane Doe")
+    assert document.updated_at == RAW_RESULT["updated_at"]
+    assert document.summary == ""
+
+    with_ai = to_document(RAW_RESULT, required_fields({"ai_topic_exclude": ["crypto"]}, dedupe=True))
+    assert (with_ai.summary, with_ai.source_url) == ("A summary", RAW_RESULT["source_url"])
+
+
+def test_documents_share_one_string_per_author():
+    first = to_document({**RAW_RESULT, "author": "".join(["Jane", " Doe"])})
+    second = to_document({**RAW_RESULT, "author": "".join(["Jane ", "Doe"])})
+    assert first.author is second.author
+    assert to_document({"id": "x", "author": None}).author == ""
@@ -0,0 +1,31 @@
+from relevance_prefilter import prefilter_relevant, topic_similarities
+
+TOPICS = ["football"]
+RELEVANT = [
+    "Manchester United signed a new striker ahead of the derby.",
+    "The football season opens with three matches on Saturday.",
+    "Fotboll: Sweden's footballers qualified for the World Cup.",
+]
+UNRELATED = "The central bank kept interest rates unchanged amid slowing inflation."
+
+
+def _docs(summaries):
+    return [{"id": str(i), "summary": summary} for i, summary in enumerate(summaries)]
+
+
+def test_disabled_by_default_so_no_relevant_document_is_skipped(monkeypatch):
+    monkeypatch.delenv("AI_PREFILTER_MIN_SIMILARITY", raising=False)
+    documents = _docs(RELEVANT + [UNRELATED])
+    assert prefilter_relevant(documents, TOPICS) == (documents, 0)
+
+
+def test_documents_sharing_topic_wording_pass_a_calibrated_floor(monkeypatch):
+    monkeypatch.setenv("AI_PREFILTER_MIN_SIMILARITY", "0.06")
+    relevant, skipped = prefilter_relevant(_docs(RELEVANT[1:] + [UNRELATED]), TOPICS)
+    assert [doc["summary"] for doc in relevant] == RELEVANT[1:]
+    assert skipped == 1
+
+
+def test_similarity_ranks_topic_wording_above_unrelated_text():
+    related, unrelated = topic_similarities([RELEVANT[1], UNRELATED], TOPICS)
+    assert related > 2 * unrelated
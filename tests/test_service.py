@@ -0,0 +1,40 @@
+import os
+import signal
+
+import pytest
+
+from service import next_interval, run_service
+
+
+@pytest.fixture
+def restore_signal_handlers():
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+    yield
+    for sig, handler in handlers.items():
+        signal.signal(sig, handler)
+
+
+def test_next_interval_resets_on_new_documents_and_backs_off_when_idle():
+    assert next_interval(240, True, (60, 900)) == 60
+    assert next_interval(240, False, (60, 900)) == 480
+    assert next_interval(600, False, (60, 900)) == 900
+
+
+def test_a_failing_pass_does_not_stop_the_service(monkeypatch, state_dir, restore_signal_handlers):
+    monkeypatch.setenv("POLL_MIN_SECONDS", "0.01")
+    monkeypatch.setenv("POLL_MAX_SECONDS", "0.02")
+    seen = []
+
+    def run_pass(updated_after):
+        seen.append(updated_after)
+        if len(seen) == 1:
+            raise ConnectionError("network down")
+        if len(seen) == 2:
+            return "2024-01-02T00:00:00+00:00"
+        os.kill(os.getpid(), signal.SIGTERM)
+        return None
+
+    run_service(run_pass, "2024-01-01T00:00:00+00:00", str(state_dir))
+    assert len(seen) == 3
+    assert seen[0] == seen[1] == "2024-01-01T00:00:00+00:00"
+    assert seen[2] != seen[1]